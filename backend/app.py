@@ -1,4 +1,5 @@
 from config import create_app, db
+import os
 
 app = create_app()
 
@@ -6,4 +7,5 @@ if __name__ == "__main__":
     with app.app_context():
         db.create_all()
 
-    app.run(debug=True)
\ No newline at end of file
+    # Development server only; production runs gunicorn with gunicorn.conf.py.
+    app.run(debug=os.getenv("FLASK_DEBUG", "false").lower() in ("1", "true"))
@@ -0,0 +1,220 @@
+"""Async ASGI entry point serving the same API as app.py:
+
+    uvicorn --factory asgi:create_asgi_app --workers 2
+
+The list endpoints of expenses, the summary and categories run as
+coroutines on SQLAlchemy's asyncio engine, so a single process keeps many
+of them in flight while they wait on the database. Every other request,
+and any read these handlers leave alone (search, NDJSON streams, invalid
+parameters, missing or possibly revoked tokens), goes to the Flask app on
+a thread pool, so clients see exactly the contract of the WSGI app.
+
+Needs starlette, a2wsgi, an ASGI server such as uvicorn and the asyncio
+driver of the database: aiosqlite or asyncpg.
+"""
+from a2wsgi import WSGIMiddleware
+from contextlib import asynccontextmanager
+from flask import jsonify, request
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.test import EnvironBuilder
+from config import create_app
+from instrumentation import instrument_engines
+from models import Category, Expense, User
+from pool_metrics import PoolMetrics
+from replica import REPLICA_BIND, wrote_within
+from routes.category import CATEGORY_DICTIONARY_FIELDS, CATEGORY_FIELDS
+from routes.expense import (
+    expense_list_response, page_size, paginate, parse_list_args, parse_summary_filters, summary_select, wants_ndjson,
+)
+from routes.formats import list_response
+from routes.versioning import etag_for, not_modified, with_etag
+import os
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+class Fallback(Exception):
+    """Raised by an async handler to let the Flask app answer the request."""
+
+def async_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+class AsyncView:
+    """ASGI endpoint running an AsyncAPI handler, or the Flask app when it raises Fallback."""
+
+    def __init__(self, api, handler):
+        self.api = api
+        self.handler = handler
+
+    async def __call__(self, scope, receive, send):
+        try:
+            if scope["method"] != "GET":
+                raise Fallback()
+            response = await self.api.run(scope, self.handler)
+        except Fallback:
+            return await self.api.wsgi(scope, receive, send)
+        await response(scope, receive, send)
+
+class AsyncAPI:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app)
+        # The pool class of the sync engines does not work with asyncio drivers.
+        options = {
+            key: value for key, value in flask_app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}).items()
+            if key != "poolclass"
+        }
+        self.primary = create_async_engine(async_url(flask_app.config["SQLALCHEMY_DATABASE_URI"]), **options)
+        self.replica = None
+        if flask_app.config["REPLICA_DATABASE_URL"]:
+            self.replica = create_async_engine(async_url(flask_app.config["REPLICA_DATABASE_URL"]), **options)
+
+        metrics = flask_app.extensions["pool_metrics"]
+        metrics["async"] = PoolMetrics(self.primary.sync_engine)
+        if self.replica is not None:
+            metrics[f"async_{REPLICA_BIND}"] = PoolMetrics(self.replica.sync_engine)
+        instrument_engines(flask_app, [engine.sync_engine for engine in (self.primary, self.replica) if engine is not None])
+
+    def route(self, path, handler):
+        return Route(path, AsyncView(self, handler), methods=["GET"])
+
+    async def run(self, scope, handler):
+        """Run handler in a Flask request context and convert the response it returns."""
+        environ = EnvironBuilder(
+            path=scope["path"],
+            method=scope["method"],
+            headers=[(key.decode("latin-1"), value.decode("latin-1")) for key, value in scope["headers"]],
+            query_string=scope["query_string"].decode(),
+        ).get_environ()
+        with self.flask_app.request_context(environ):
+            # before_request hooks that answer the request themselves are left to the Flask app.
+            if self.flask_app.preprocess_request() is not None:
+                raise Fallback()
+            flask_response = self.flask_app.process_response(await handler(scope["path_params"]["user_id"]))
+        # The same header and body finalization werkzeug applies when serving over WSGI.
+        response = Response(b"".join(flask_response.get_app_iter(environ)), status_code=flask_response.status_code)
+        response.raw_headers = [
+            (key.lower().encode("latin-1"), value.encode("latin-1"))
+            for key, value in flask_response.get_wsgi_headers(environ).items()
+        ]
+        return response
+
+    def authorize(self, user_id):
+        """Accept only a valid access token of user_id that is surely not revoked."""
+        config = self.flask_app.config
+        scheme, _, token = request.headers.get(config["JWT_HEADER_NAME"], "").partition(" ")
+        if scheme != config["JWT_HEADER_TYPE"] or not token:
+            raise Fallback()
+        try:
+            claims = decode_token(token)
+        except (PyJWTError, JWTExtendedException):
+            raise Fallback()
+        if claims.get("type") != "access" or claims.get(config["JWT_IDENTITY_CLAIM"]) != user_id:
+            raise Fallback()
+        # Until this worker's filter is loaded, and on filter hits, the Flask app checks the denylist.
+        store = self.flask_app.extensions["revocation_store"]
+        if store.pid != os.getpid() or claims["jti"] in store.filter:
+            raise Fallback()
+
+    @asynccontextmanager
+    async def read_session(self, user_id):
+        """Session for the user's reads and the data version it sees, routed like RoutingSession."""
+        engine = self.primary
+        if self.replica is not None:
+            async with AsyncSession(self.primary) as session:
+                last_write_at = await session.scalar(select(User.last_write_at).where(User.id == user_id))
+            if not wrote_within(last_write_at, self.flask_app.config["READ_YOUR_WRITES_SECONDS"]):
+                engine = self.replica
+        async with AsyncSession(engine) as session:
+            yield session, await session.scalar(select(User.data_version).where(User.id == user_id))
+
+    async def get_expenses(self, user_id):
+        self.authorize(user_id)
+        if request.args.get("q", "").strip() or wants_ndjson():
+            raise Fallback()
+        try:
+            filters, _, limit = parse_list_args(user_id, request.args, "")
+        except ValueError:
+            raise Fallback()
+
+        async with self.read_session(user_id) as (session, version):
+            etag = self.etag(user_id, "expenses", version)
+            if not_modified(etag):
+                return with_etag(("", 304), etag)
+
+            statement = Expense.list_select(*filters).order_by(Expense.date, Expense.id)
+            if limit is None and not request.args.get("cursor"):
+                return with_etag(expense_list_response((await session.execute(statement)).all()), etag)
+
+            limit = page_size(limit)
+            expenses = (await session.execute(statement.limit(limit + 1))).all()
+        expenses, next_cursor = paginate(expenses, limit, 0, "")
+        return with_etag(expense_list_response(expenses, next_cursor=next_cursor), etag)
+
+    async def get_summary(self, user_id):
+        self.authorize(user_id)
+        try:
+            filters = parse_summary_filters(user_id, request.args)
+        except ValueError:
+            raise Fallback()
+
+        async with self.read_session(user_id) as (session, version):
+            etag = self.etag(user_id, "summary", version)
+            if not_modified(etag):
+                return with_etag(("", 304), etag)
+            rows = (await session.execute(summary_select(*filters))).all()
+        summary = [{**rollup.to_json(), "Category": category} for rollup, category in rows]
+        return with_etag(jsonify({"summary": summary}), etag)
+
+    async def get_categories(self, user_id):
+        self.authorize(user_id)
+        cache = self.flask_app.extensions["category_cache"]
+
+        async with self.read_session(user_id) as (session, version):
+            etag = self.etag(user_id, "categories", version)
+            if not_modified(etag):
+                return with_etag(("", 304), etag)
+
+            category_version = await session.scalar(select(User.category_version).where(User.id == user_id))
+            json_categories = cache.get(user_id, category_version)
+            if json_categories is None:
+                categories = (await session.scalars(select(Category).where(Category.user_id == user_id))).all()
+                json_categories = list(map(lambda x: x.to_json(), categories))
+                cache.set(user_id, category_version, json_categories)
+        return with_etag(list_response("categories", json_categories, CATEGORY_FIELDS, CATEGORY_DICTIONARY_FIELDS), etag)
+
+    def etag(self, user_id, resource, version):
+        return etag_for(resource, user_id, version, request.query_string.decode(), request.headers.get("Accept", ""))
+
+    async def dispose(self):
+        await self.primary.dispose()
+        if self.replica is not None:
+            await self.replica.dispose()
+
+def create_asgi_app(config_name=None):
+    api = AsyncAPI(create_app(config_name))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await api.dispose()
+
+    asgi_app = Starlette(
+        routes=[
+            api.route("/api/expense/{user_id}/expenses", api.get_expenses),
+            api.route("/api/expense/{user_id}/summary", api.get_summary),
+            api.route("/api/category/{user_id}/categories", api.get_categories),
+            Mount("/", app=api.wsgi),
+        ],
+        lifespan=lifespan,
+    )
+    asgi_app.state.api = api
+    return asgi_app
@@ -0,0 +1,194 @@
+"""Read throughput of the async ASGI app vs. the sync WSGI app at high concurrency.
+
+Both servers run against the same seeded SQLite file. --db-latency-ms adds
+a round trip to every statement, as a database across the network would:
+the sync app waits for it blocking its worker, the async app awaits it.
+Run from the backend directory:
+
+    python -m benchmarks.bench_async --concurrency 64 --seconds 10 --db-latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+from unittest import mock
+
+import httpx
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, insert
+from sqlalchemy.util import await_only
+
+from config import DevelopmentConfig, create_app, db
+from models import Category, Expense, ExpenseRollup, User
+
+
+def delay_statements(engine, is_async):
+    seconds = float(os.getenv("BENCH_DB_LATENCY_MS", 0)) / 1000
+    if seconds <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def round_trip(*args):
+        if is_async:
+            await_only(asyncio.sleep(seconds))
+        else:
+            time.sleep(seconds)
+
+
+def wsgi_app():
+    app = create_app("development")
+    with app.app_context():
+        delay_statements(db.engine, is_async=False)
+    return app
+
+
+def asgi_app():
+    from asgi import create_asgi_app
+    app = create_asgi_app("development")
+    delay_statements(app.state.api.primary.sync_engine, is_async=True)
+    # Requests the async handlers pass to the Flask app hit its engine.
+    with app.state.api.flask_app.app_context():
+        delay_statements(db.engine, is_async=False)
+    return app
+
+
+def seed(url, secret, expenses):
+    with mock.patch.object(DevelopmentConfig, "SQLALCHEMY_DATABASE_URI", url):
+        app = create_app("development")
+    app.config["JWT_SECRET_KEY"] = secret
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench", password="unused")
+        db.session.add(user)
+        db.session.flush()
+        categories = [Category(user_id=user.id, category=f"category{i}") for i in range(10)]
+        db.session.add_all(categories)
+        db.session.flush()
+        db.session.execute(insert(Expense), [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user.id,
+                "date": date(2024, 1, 1) + timedelta(days=i % 365),
+                "category_id": categories[i % 10].id,
+                "amount": i % 200 + 0.99,
+                "description": f"expense {i}",
+            }
+            for i in range(expenses)
+        ])
+        ExpenseRollup.rebuild()
+        db.session.commit()
+        return user.id, create_access_token(identity=user.id, expires_delta=timedelta(hours=1))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(command, port, env):
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    start = time.perf_counter()
+    while time.perf_counter() - start < 30:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/metrics/cache", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"Server did not start: {command}")
+
+
+async def drive(base_url, paths, headers, concurrency, seconds):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker(client, offset):
+        nonlocal errors
+        i = offset
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)], headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += response.status_code != 200
+            i += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await asyncio.gather(*(worker(client, i) for i in range(concurrency)))
+
+    latencies.sort()
+    return {
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "errors": errors,
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--db-latency-ms", type=float, default=20)
+    parser.add_argument("--expenses", type=int, default=10000)
+    parser.add_argument("--sync-workers", default="1,4", help="Comma separated gunicorn worker counts")
+    parser.add_argument("--pool-size", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{directory}/bench.db"
+        secret = uuid.uuid4().hex
+        user_id, token = seed(url, secret, args.expenses)
+        env = {
+            **os.environ,
+            "DATABASE_URL": url,
+            "JWT_SECRET_KEY": secret,
+            "BENCH_DB_LATENCY_MS": str(args.db_latency_ms),
+            "DB_POOL_SIZE": str(args.pool_size),
+        }
+        paths = [
+            f"/api/expense/{user_id}/expenses?limit=50",
+            f"/api/expense/{user_id}/summary",
+            f"/api/category/{user_id}/categories",
+        ]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        servers = {
+            f"sync_{workers}_workers": [
+                sys.executable, "-m", "gunicorn", "-w", workers, "-b", "127.0.0.1:{port}",
+                "benchmarks.bench_async:wsgi_app()",
+            ]
+            for workers in args.sync_workers.split(",")
+        }
+        servers["async_1_worker"] = [
+            sys.executable, "-m", "uvicorn", "--factory", "benchmarks.bench_async:asgi_app",
+            "--port", "{port}", "--log-level", "warning",
+        ]
+
+        results = {"concurrency": args.concurrency, "db_latency_ms": args.db_latency_ms}
+        for name, command in servers.items():
+            port = free_port()
+            process = start_server([part.format(port=port) for part in command], port, env)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                asyncio.run(drive(base_url, paths, headers, args.concurrency, 1))
+                results[name] = asyncio.run(drive(base_url, paths, headers, args.concurrency, args.seconds))
+            finally:
+                process.terminate()
+                process.wait()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare expense creation throughput: one request per item vs. expenses:batch.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_batch_create --items 2000
+"""
+import argparse
+import json
+import time
+import uuid
+
+from flask_jwt_extended import create_access_token
+
+from config import create_app, db
+from models import Category, User
+
+
+def setup(app):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username=f"bench-{uuid.uuid4().hex}", password="x")
+        db.session.add(user)
+        db.session.commit()
+        category = Category(user_id=user.id, category="Groceries")
+        db.session.add(category)
+        db.session.commit()
+        token = create_access_token(identity=user.id)
+        return user.id, category.id, {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+
+def make_items(category_id, count):
+    return [
+        {"date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "categoryId": category_id, "amount": i % 500 + 0.99, "description": f"Item {i}"}
+        for i in range(count)
+    ]
+
+
+def bench_single(app, items_count):
+    user_id, category_id, headers = setup(app)
+    client = app.test_client()
+    items = make_items(category_id, items_count)
+    start = time.perf_counter()
+    for item in items:
+        response = client.post(f"/api/expense/{user_id}/expenses", data=json.dumps(item), headers=headers)
+        assert response.status_code == 201, response.json
+    return time.perf_counter() - start
+
+
+def bench_batch(app, items_count, batch_size):
+    user_id, category_id, headers = setup(app)
+    client = app.test_client()
+    items = make_items(category_id, items_count)
+    start = time.perf_counter()
+    for offset in range(0, len(items), batch_size):
+        payload = {"expenses": items[offset:offset + batch_size]}
+        response = client.post(f"/api/expense/{user_id}/expenses:batch", data=json.dumps(payload), headers=headers)
+        assert response.status_code == 201, response.json
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--config", default="testing", help="Config name; use development with DATABASE_URL for PostgreSQL")
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    app.config["JWT_SECRET_KEY"] = uuid.uuid4().hex
+
+    results = {}
+    for name, run in (
+        ("single", lambda: bench_single(app, args.items)),
+        ("batch", lambda: bench_batch(app, args.items, args.batch_size)),
+    ):
+        elapsed = run()
+        results[name] = {"seconds": round(elapsed, 4), "items_per_second": round(args.items / elapsed, 1)}
+
+    results["speedup"] = round(results["batch"]["items_per_second"] / results["single"]["items_per_second"], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
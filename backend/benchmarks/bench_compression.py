@@ -0,0 +1,88 @@
+"""CPU cost vs. bytes saved of gzip levels and Brotli qualities.
+
+Compresses a real expense list response (one user's full JSON list and its
+NDJSON stream, generated by the seeder) at several levels. Buffered bodies
+are compressed in one go, streams through compression.compress_stream as
+the server does. Run from the backend directory:
+
+    python -m benchmarks.bench_compression --expenses 20000
+"""
+import argparse
+import json
+import tempfile
+import time
+import uuid
+from unittest import mock
+
+from flask_jwt_extended import create_access_token
+
+from compression import BrotliEncoder, GzipEncoder, brotli, compress_stream
+from config import DevelopmentConfig, create_app, db
+from models import User
+import seeding
+
+GZIP_LEVELS = [1, 3, 5, 6, 9]
+BROTLI_QUALITIES = [1, 3, 4, 5, 7, 9]
+
+
+def response_bodies(expenses):
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{directory}/bench.db"
+        with mock.patch.multiple(DevelopmentConfig, SQLALCHEMY_DATABASE_URI=url, REVOCATION_SYNC_INTERVAL=0):
+            app = create_app("development")
+        app.config["JWT_SECRET_KEY"] = uuid.uuid4().hex
+        with app.app_context():
+            db.create_all()
+            seeding.seed(db.session, users=1, categories=12, expenses=expenses, password="unused")
+            user_id = User.query.one().id
+            headers = {"Authorization": f"Bearer {create_access_token(identity=user_id)}", "Accept-Encoding": "identity"}
+        client = app.test_client()
+        url = f"/api/expense/{user_id}/expenses"
+        body = client.get(url, headers=headers).get_data()
+        stream = client.get(url, headers={**headers, "Accept": "application/x-ndjson"})
+        chunks = list(stream.response)
+        stream.close()
+        return body, chunks
+
+
+def measure(new_encoder, chunks, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        encoder = new_encoder()
+        if len(chunks) > 1:
+            size = sum(map(len, compress_stream(iter(chunks), encoder)))
+        else:
+            size = len(encoder.compress(chunks[0]) + encoder.finish())
+        best = min(best, time.process_time() - start)
+    raw = sum(map(len, chunks))
+    return {
+        "bytes": size,
+        "ratio": round(raw / size, 2),
+        "saved_percent": round(100 * (1 - size / raw), 1),
+        "cpu_ms": round(best * 1000, 2),
+        "mb_per_second": round(raw / best / 2 ** 20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expenses", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    body, chunks = response_bodies(args.expenses)
+    results = {"json_bytes": len(body), "ndjson_bytes": sum(map(len, chunks)), "ndjson_chunks": len(chunks)}
+    encoders = {f"gzip_{level}": (lambda level=level: GzipEncoder(level)) for level in GZIP_LEVELS}
+    if brotli is not None:
+        encoders.update({f"br_{quality}": (lambda quality=quality: BrotliEncoder(quality)) for quality in BROTLI_QUALITIES})
+    for name, new_encoder in encoders.items():
+        results[name] = {
+            "json": measure(new_encoder, [body], args.repeat),
+            "ndjson_stream": measure(new_encoder, chunks, args.repeat),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
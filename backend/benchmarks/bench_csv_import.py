@@ -0,0 +1,81 @@
+"""Measure CSV import time and peak process memory for a generated file.
+
+Rows are generated on the fly, so the source file is never held in memory
+either. Run from the backend directory:
+
+    python -m benchmarks.bench_csv_import --rows 1000000
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_csv_import --config development
+"""
+import argparse
+import io
+import json
+import resource
+import time
+import uuid
+
+from config import create_app, db
+from models import User
+from routes.expense import import_expenses_csv
+
+CATEGORIES = ["Groceries", "Dining", "Transport", "Rent", "Utilities", "Travel", "Health", "Gifts"]
+
+
+class GeneratedCSV(io.RawIOBase):
+    """A readable byte stream producing rows lazily."""
+
+    def __init__(self, rows):
+        self.lines = self._lines(rows)
+        self.buffer = b""
+
+    def _lines(self, rows):
+        yield b"date,category,amount,description\n"
+        for i in range(rows):
+            yield f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d},{CATEGORIES[i % len(CATEGORIES)]},{i % 900 + 0.5},Row {i}\n".encode()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while len(self.buffer) < len(buffer):
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.buffer += line
+        size = min(len(buffer), len(self.buffer))
+        buffer[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--config", default="testing")
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    with app.app_context():
+        db.create_all()
+        user = User(username=f"bench-{uuid.uuid4().hex}", password="x")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+        start = time.perf_counter()
+        for progress in import_expenses_csv(user_id, GeneratedCSV(args.rows), chunk_size=args.chunk_size):
+            pass
+        elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "rows": args.rows,
+        "imported": progress["imported"],
+        "rejected": progress["rejected"],
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(args.rows / elapsed),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
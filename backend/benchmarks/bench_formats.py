@@ -0,0 +1,113 @@
+"""Payload size and decode time of the list wire formats.
+
+Fetches one user's full expense list and category list, generated by the
+seeder, as JSON rows, columnar JSON and msgpack, and reports per format the
+response time, body size (raw and compressed as the server would) and the
+client-side time to decode it back to row objects (and, for columnar
+JSON, to parse it alone). Run from the backend directory:
+
+    python -m benchmarks.bench_formats --expenses 20000 --categories 1000
+"""
+import argparse
+import gzip
+import json
+import statistics
+import tempfile
+import time
+import uuid
+from unittest import mock
+
+from flask_jwt_extended import create_access_token
+
+from compression import brotli
+from config import DevelopmentConfig, create_app, db
+from models import User
+from routes.formats import COLUMNAR, JSON, MSGPACK, msgpack
+import seeding
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def from_columnar(document):
+    dictionaries = document["dictionaries"]
+    columns = [
+        [dictionaries[field][code] for code in column] if field in dictionaries else column
+        for field, column in zip(document["fields"], document["columns"])
+    ]
+    return [dict(zip(document["fields"], values)) for values in zip(*columns)]
+
+
+def decoders(key):
+    """Functions turning a response body back into the list of row dicts, per format and library."""
+    decoders = {JSON: {"json": lambda body: json.loads(body)[key]}}
+    decoders[COLUMNAR] = {"json": lambda body: from_columnar(json.loads(body)[key])}
+    if orjson is not None:
+        decoders[JSON]["orjson"] = lambda body: orjson.loads(body)[key]
+        decoders[COLUMNAR]["orjson"] = lambda body: from_columnar(orjson.loads(body)[key])
+        # Clients reading the columns directly skip building row objects.
+        decoders[COLUMNAR]["orjson_columns_only"] = lambda body: orjson.loads(body)[key]
+    if msgpack is not None:
+        decoders[MSGPACK] = {"msgpack": lambda body: msgpack.unpackb(body)[key]}
+    return decoders
+
+
+def best_of(repeat, function):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"best_ms": round(min(times) * 1000, 2), "median_ms": round(statistics.median(times) * 1000, 2)}
+
+
+def compare(client, url, headers, key, repeat):
+    results = {}
+    expected = None
+    for mimetype, libraries in decoders(key).items():
+        request_headers = {**headers, "Accept": mimetype, "Accept-Encoding": "identity"}
+        body = client.get(url, headers=request_headers).get_data()
+        rows = next(iter(libraries.values()))(body)
+        expected = expected or rows
+        assert rows == expected, mimetype
+        result = {
+            "get": best_of(repeat, lambda: client.get(url, headers=request_headers)),
+            "bytes": len(body),
+            "gzip_1_bytes": len(gzip.compress(body, 1)),
+            "decode": {library: best_of(repeat, lambda d=decode: d(body)) for library, decode in libraries.items()},
+        }
+        if brotli is not None:
+            result["br_1_bytes"] = len(brotli.compress(body, quality=1))
+        results[mimetype] = result
+    return {"rows": len(expected), **results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expenses", type=int, default=20000)
+    parser.add_argument("--categories", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{directory}/bench.db"
+        with mock.patch.multiple(DevelopmentConfig, SQLALCHEMY_DATABASE_URI=url, REVOCATION_SYNC_INTERVAL=0):
+            app = create_app("development")
+        app.config["JWT_SECRET_KEY"] = uuid.uuid4().hex
+        with app.app_context():
+            db.create_all()
+            seeding.seed(db.session, users=1, categories=args.categories, expenses=args.expenses, password="unused")
+            user_id = User.query.one().id
+            headers = {"Authorization": f"Bearer {create_access_token(identity=user_id)}"}
+        client = app.test_client()
+        results = {
+            "expenses": compare(client, f"/api/expense/{user_id}/expenses", headers, "expenses", args.repeat),
+            "categories": compare(client, f"/api/category/{user_id}/categories", headers, "categories", args.repeat),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
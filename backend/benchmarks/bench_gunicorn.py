@@ -0,0 +1,116 @@
+"""Startup time, memory and throughput of gunicorn.conf.py per worker class.
+
+For each worker class (gevent only if installed), with and without
+preload, this starts gunicorn with the production profile and measures:
+- the time until the first response
+- the proportional set size (PSS) of the master and all workers, idle
+  and after the load, which shows how much of the preloaded app they share
+- the read throughput at a fixed concurrency
+
+--db-latency-ms adds a round trip to every statement, as a database across
+the network would, which is where gthread and gevent workers differ from
+sync ones. Run from the backend directory:
+
+    python -m benchmarks.bench_gunicorn --concurrency 32 --seconds 10 --db-latency-ms 5
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from benchmarks.bench_async import drive, free_port, seed, start_server
+
+
+def pss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            for line in smaps:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+
+
+def server_pss(pid):
+    """PSS of the master and its workers, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            pids = [pid] + [int(child) for child in children.read().split()]
+    except OSError:
+        return None
+    sizes = [pss_bytes(p) for p in pids]
+    return None if None in sizes else sum(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worker-classes", default="sync,gthread,gevent")
+    parser.add_argument("--workers", type=int, help="Defaults to the profile's choice per worker class")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--db-latency-ms", type=float, default=5)
+    parser.add_argument("--expenses", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{directory}/bench.db"
+        secret = uuid.uuid4().hex
+        user_id, token = seed(url, secret, args.expenses)
+        paths = [
+            f"/api/expense/{user_id}/expenses?limit=50",
+            f"/api/expense/{user_id}/summary",
+            f"/api/category/{user_id}/categories",
+        ]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        results = {"cpus": os.cpu_count(), "concurrency": args.concurrency, "db_latency_ms": args.db_latency_ms}
+        for worker_class in args.worker_classes.split(","):
+            if worker_class == "gevent" and not importlib.util.find_spec("gevent"):
+                results[worker_class] = "gevent is not installed"
+                continue
+            for preload in ("true", "false"):
+                env = {
+                    **os.environ,
+                    "DATABASE_URL": url,
+                    "JWT_SECRET_KEY": secret,
+                    "BENCH_DB_LATENCY_MS": str(args.db_latency_ms),
+                    "GUNICORN_WORKER_CLASS": worker_class,
+                    "GUNICORN_PRELOAD": preload,
+                }
+                if args.workers:
+                    env["GUNICORN_WORKERS"] = str(args.workers)
+                port = free_port()
+                command = [
+                    sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}",
+                    "benchmarks.bench_async:wsgi_app()",
+                ]
+                started = time.perf_counter()
+                process = start_server(command, port, env)
+                startup = time.perf_counter() - started
+                try:
+                    # Until every worker has booted and loaded the app.
+                    time.sleep(2)
+                    idle_pss = server_pss(process.pid)
+                    base_url = f"http://127.0.0.1:{port}"
+                    asyncio.run(drive(base_url, paths, headers, args.concurrency, 1))
+                    run = asyncio.run(drive(base_url, paths, headers, args.concurrency, args.seconds))
+                    loaded_pss = server_pss(process.pid)
+                finally:
+                    process.terminate()
+                    process.wait()
+                results[f"{worker_class}_preload_{preload}"] = {
+                    "startup_seconds": round(startup, 2),
+                    "idle_pss_mb": round(idle_pss / 2 ** 20, 1) if idle_pss else None,
+                    "loaded_pss_mb": round(loaded_pss / 2 ** 20, 1) if loaded_pss else None,
+                    **run,
+                }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Serialization time of the expense and category lists per JSON provider.
+
+Compares Flask's DefaultJSONProvider with json_provider.JSONProvider, on
+orjson and on its json module fallback, for one user's full expense list
+and a category list generated by the seeder. Reports the encoding time of
+the list payloads alone and the time of whole GET requests through the
+test client. Run from the backend directory:
+
+    python -m benchmarks.bench_json --expenses 20000 --categories 10000
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+import uuid
+from contextlib import nullcontext
+from unittest import mock
+
+from flask.json.provider import DefaultJSONProvider
+from flask_jwt_extended import create_access_token
+
+from config import DevelopmentConfig, create_app, db
+from models import Category, Expense, User
+import json_provider
+import seeding
+
+PROVIDERS = {
+    "flask_default": (DefaultJSONProvider, nullcontext),
+    "orjson": (json_provider.JSONProvider, nullcontext),
+    "fallback": (json_provider.JSONProvider, lambda: mock.patch.object(json_provider, "orjson", None)),
+}
+
+
+def best_of(repeat, function):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"best_ms": round(min(times) * 1000, 2), "median_ms": round(statistics.median(times) * 1000, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expenses", type=int, default=20000)
+    parser.add_argument("--categories", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{directory}/bench.db"
+        # Compression would dominate the request times being compared.
+        with mock.patch.multiple(DevelopmentConfig, SQLALCHEMY_DATABASE_URI=url, REVOCATION_SYNC_INTERVAL=0,
+                                 RESPONSE_COMPRESSION=False):
+            app = create_app("development")
+        app.config["JWT_SECRET_KEY"] = uuid.uuid4().hex
+        with app.app_context():
+            db.create_all()
+            seeding.seed(db.session, users=1, categories=args.categories, expenses=args.expenses, password="unused")
+            user_id = User.query.one().id
+            headers = {"Authorization": f"Bearer {create_access_token(identity=user_id)}"}
+            payloads = {
+                "expenses": {"expenses": list(map(Expense.row_to_json, Expense.list_query(Expense.user_id == user_id)))},
+                "categories": {"categories": [c.to_json() for c in Category.query.filter_by(user_id=user_id)]},
+            }
+        urls = {"expenses": f"/api/expense/{user_id}/expenses", "categories": f"/api/category/{user_id}/categories"}
+
+        client = app.test_client()
+        results = {"expenses": len(payloads["expenses"]["expenses"]), "categories": len(payloads["categories"]["categories"])}
+        for name, (provider_class, context) in PROVIDERS.items():
+            app.json = provider_class(app)
+            with context(), app.app_context():
+                results[name] = {
+                    **{f"dumps_{key}": best_of(args.repeat, lambda p=payload: app.json.dumps(p)) for key, payload in payloads.items()},
+                    **{f"get_{key}": best_of(args.repeat, lambda u=url: client.get(u, headers=headers)) for key, url in urls.items()},
+                    "bytes": {key: len(app.json.dumps(payload)) for key, payload in payloads.items()},
+                }
+        baseline = results["flask_default"]
+        for name in ("orjson", "fallback"):
+            results[name]["speedup"] = {
+                key: round(baseline[key]["best_ms"] / results[name][key]["best_ms"], 2)
+                for key in baseline if key != "bytes"
+            }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
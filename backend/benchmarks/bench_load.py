@@ -0,0 +1,320 @@
+"""End-to-end load benchmark of every API route.
+
+Seeds users, categories and expenses, starts the server (gunicorn for the
+WSGI app or uvicorn for the ASGI app), then sends a fixed number of
+requests to each route at a fixed concurrency and reports throughput and
+p50/p95/p99 latency per route as JSON. Read-only routes run first and
+destructive ones last, so every route sees the seeded data set. Run from
+the backend directory:
+
+    python -m benchmarks.bench_load --users 10 --expenses 100000 --concurrency 16 --output run.json
+    python -m benchmarks.bench_load --database-url postgresql://localhost/expenses_bench --server uvicorn
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from unittest import mock
+
+import httpx
+from flask_jwt_extended import create_access_token, create_refresh_token
+from sqlalchemy import insert, select
+from werkzeug.security import generate_password_hash
+
+from benchmarks.bench_async import free_port, start_server
+from config import DevelopmentConfig, create_app, db
+from models import Category, Expense, ExpenseRollup, User
+
+PASSWORD = "load-test-password"
+WORDS = ["coffee", "groceries", "rent", "fuel", "lunch", "cinema", "books", "train", "gym", "pharmacy"]
+BULK_SIZE = 10
+BATCH_SIZE = 100
+
+
+def seed(url, secret, args):
+    """Insert the data set and return the per-user state the scenarios draw from."""
+    with mock.patch.object(DevelopmentConfig, "SQLALCHEMY_DATABASE_URI", url):
+        app = create_app("development")
+    app.config["JWT_SECRET_KEY"] = secret
+    rng = random.Random(args.seed)
+    run = uuid.uuid4().hex[:8]
+    password = generate_password_hash(PASSWORD, method=app.config["PASSWORD_HASH_METHOD"])
+    now = datetime.datetime.now(tz=datetime.UTC)
+
+    with app.app_context():
+        db.create_all()
+        users = [{"id": str(uuid.uuid4()), "username": f"load-{run}-{i}"} for i in range(args.users)]
+        db.session.execute(insert(User), [
+            {**user, "password": password, "created_at": now, "updated_at": now} for user in users
+        ])
+        for user in users:
+            user["categories"] = [str(uuid.uuid4()) for _ in range(args.categories)]
+            # Categories without expenses, for the delete route.
+            user["spare_categories"] = [str(uuid.uuid4()) for _ in range(args.requests // args.users + 1)]
+            db.session.execute(insert(Category), [
+                {"id": category_id, "user_id": user["id"], "category": f"category-{i}", "created_at": now, "updated_at": now}
+                for i, category_id in enumerate(user["categories"] + user["spare_categories"])
+            ])
+
+        start = datetime.date.today() - datetime.timedelta(days=730)
+        for offset in range(0, args.expenses, 10000):
+            rows = []
+            for i in range(offset, min(offset + 10000, args.expenses)):
+                user = users[i % len(users)]
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "user_id": user["id"],
+                    "date": start + datetime.timedelta(days=rng.randrange(730)),
+                    "category_id": rng.choice(user["categories"]),
+                    "amount": round(rng.lognormvariate(3, 1), 2),
+                    "description": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            db.session.execute(insert(Expense), rows)
+        ExpenseRollup.rebuild()
+        db.session.commit()
+
+        for user in users:
+            user["expenses"] = db.session.execute(
+                select(Expense.id).where(Expense.user_id == user["id"]).order_by(Expense.id)
+            ).scalars().all()
+            user["access"] = create_access_token(identity=user["id"], expires_delta=datetime.timedelta(hours=2))
+            user["refresh"] = create_refresh_token(identity=user["id"])
+        # Logout revokes its token, so every logout request needs its own.
+        logout_tokens = [
+            create_access_token(identity=users[i % len(users)]["id"]) for i in range(args.requests)
+        ]
+    return run, users, logout_tokens
+
+
+def scenarios(run, users, logout_tokens, args):
+    """(name, request count, function of the request number returning method, path and httpx options)."""
+    def user(i):
+        return users[i % len(users)]
+
+    def auth(i, token=None):
+        return {"headers": {"Authorization": f"Bearer {token or user(i)['access']}"}}
+
+    def expense_ids(i, per_request, skip=0):
+        # Each user's ids are consumed in order, distinct per request: patch ids first, then deletions.
+        ids = user(i)["expenses"]
+        start = skip + (i // len(users)) * per_request
+        if start + per_request > len(ids):
+            raise SystemExit("Seed more expenses per user for this many requests")
+        return ids[start:start + per_request]
+
+    n, heavy = args.requests, args.heavy_requests
+    per_user = n // len(users) + 1
+    deleted_singles = per_user
+    today = datetime.date.today()
+
+    def csv_body(i):
+        lines = ["date,category,amount,description"] + [
+            f"{today.isoformat()},category-{j % args.categories},{j}.25,import {i} {j}" for j in range(BATCH_SIZE)
+        ]
+        return "\n".join(lines).encode()
+
+    return [
+        ("category.get_expenses", n, lambda i: ("GET", f"/api/category/{user(i)['id']}/categories", auth(i))),
+        ("expense.get_expenses[page]", n, lambda i: ("GET", f"/api/expense/{user(i)['id']}/expenses?limit=50", auth(i))),
+        ("expense.get_expenses[filter]", n, lambda i: (
+            "GET",
+            f"/api/expense/{user(i)['id']}/expenses?from={today - datetime.timedelta(days=60)}&limit=100",
+            auth(i),
+        )),
+        ("expense.get_expenses[search]", n, lambda i: (
+            "GET", f"/api/expense/{user(i)['id']}/expenses?q={WORDS[i % len(WORDS)]}&limit=50", auth(i),
+        )),
+        ("expense.get_expenses[all]", heavy, lambda i: ("GET", f"/api/expense/{user(i)['id']}/expenses", auth(i))),
+        ("expense.get_expenses[ndjson]", heavy, lambda i: (
+            "GET",
+            f"/api/expense/{user(i)['id']}/expenses",
+            {"headers": {**auth(i)["headers"], "Accept": "application/x-ndjson"}},
+        )),
+        ("expense.get_summary", n, lambda i: ("GET", f"/api/expense/{user(i)['id']}/summary", auth(i))),
+        ("expense.export_expenses", heavy, lambda i: ("GET", f"/api/expense/{user(i)['id']}/export?format=csv", auth(i))),
+        ("auth.login", heavy, lambda i: (
+            "POST", "/api/auth/login", {"json": {"username": user(i)["username"], "password": PASSWORD}},
+        )),
+        ("auth.register", heavy, lambda i: (
+            "POST", "/api/auth/register", {"json": {"username": f"load-{run}-new-{i}", "password": PASSWORD}},
+        )),
+        ("auth.refresh", n, lambda i: ("POST", "/api/auth/refresh", auth(i, user(i)["refresh"]))),
+        ("auth.logout", n, lambda i: ("POST", "/api/auth/logout", auth(i, logout_tokens[i]))),
+        ("category.create_category", n, lambda i: (
+            "POST", f"/api/category/{user(i)['id']}/categories", {**auth(i), "json": {"Category": f"created-{i}"}},
+        )),
+        ("category.update_category", n, lambda i: (
+            "PATCH",
+            f"/api/category/{user(i)['id']}/categories/{user(i)['categories'][i % args.categories]}",
+            {**auth(i), "json": {"Category": f"renamed-{i}"}},
+        )),
+        ("expense.create_expense", n, lambda i: (
+            "POST",
+            f"/api/expense/{user(i)['id']}/expenses",
+            {**auth(i), "json": {
+                "date": today.isoformat(), "categoryId": user(i)["categories"][0], "amount": "12.34",
+                "description": f"created {i}",
+            }},
+        )),
+        ("expense.create_expenses_batch", heavy, lambda i: (
+            "POST",
+            f"/api/expense/{user(i)['id']}/expenses:batch",
+            {**auth(i), "json": {"expenses": [
+                {"date": today.isoformat(), "categoryId": user(i)["categories"][j % args.categories],
+                 "amount": f"{j}.50", "description": f"batch {i} {j}"}
+                for j in range(BATCH_SIZE)
+            ]}},
+        )),
+        ("expense.import_expenses", heavy, lambda i: (
+            "POST",
+            f"/api/expense/{user(i)['id']}/expenses:import",
+            {"headers": {**auth(i)["headers"], "Content-Type": "text/csv"}, "content": csv_body(i)},
+        )),
+        ("expense.update_expense", n, lambda i: (
+            "PATCH",
+            f"/api/expense/{user(i)['id']}/expenses/{expense_ids(i, 1)[0]}",
+            {**auth(i), "json": {"amount": 42.5}},
+        )),
+        ("expense.bulk_update_expenses", n, lambda i: (
+            "POST",
+            f"/api/expense/{user(i)['id']}/expenses:bulkUpdate",
+            {**auth(i), "json": {"ids": expense_ids(i, BULK_SIZE), "set": {"amount": "9.99"}}},
+        )),
+        ("expense.delete_expense", n, lambda i: (
+            "DELETE", f"/api/expense/{user(i)['id']}/expenses/{expense_ids(i, 1)[0]}", auth(i),
+        )),
+        ("expense.bulk_delete_expenses", n, lambda i: (
+            "POST",
+            f"/api/expense/{user(i)['id']}/expenses:bulkDelete",
+            {**auth(i), "json": {"ids": expense_ids(i, BULK_SIZE, skip=deleted_singles)}},
+        )),
+        ("category.delete_category", n, lambda i: (
+            "DELETE",
+            f"/api/category/{user(i)['id']}/categories/{user(i)['spare_categories'][i // len(users)]}",
+            auth(i),
+        )),
+    ]
+
+
+async def drive(base_url, build, count, concurrency):
+    latencies = []
+    statuses = {}
+    next_request = 0
+
+    async def worker(client):
+        nonlocal next_request
+        while next_request < count:
+            i = next_request
+            next_request += 1
+            method, path, options = build(i)
+            start = time.perf_counter()
+            response = await client.request(method, path, **options)
+            await response.aread()
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(p):
+        return round(latencies[max(int(len(latencies) * p) - 1, 0)], 2)
+
+    return {
+        "requests": count,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(count / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+        "errors": sum(n for status, n in statuses.items() if status >= 400),
+    }
+
+
+def server_command(args, port):
+    if args.server == "uvicorn":
+        return [
+            sys.executable, "-m", "uvicorn", "--factory", "asgi:create_asgi_app", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ]
+    return [
+        sys.executable, "-m", "gunicorn", "-w", str(args.workers), "-b", f"127.0.0.1:{port}",
+        "config:create_app('development')",
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Defaults to a new SQLite file")
+    parser.add_argument("--server", choices=["gunicorn", "uvicorn"], default="gunicorn")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--categories", type=int, default=10, help="Per user")
+    parser.add_argument("--expenses", type=int, default=100000, help="In total, spread over the users")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Per route")
+    parser.add_argument("--heavy-requests", type=int, default=20, help="Per route for hashing, full lists, exports and imports")
+    parser.add_argument("--only", help="Regular expression selecting routes by name")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{directory}/load.db"
+        secret = uuid.uuid4().hex
+        started = time.perf_counter()
+        run, users, logout_tokens = seed(url, secret, args)
+        seed_seconds = time.perf_counter() - started
+
+        env = {**os.environ, "FLASK_CONFIG": "development", "DATABASE_URL": url, "JWT_SECRET_KEY": secret}
+        port = free_port()
+        process = start_server(server_command(args, port), port, env)
+        routes = {}
+        try:
+            for name, count, build in scenarios(run, users, logout_tokens, args):
+                if args.only and not re.search(args.only, name):
+                    continue
+                routes[name] = asyncio.run(drive(f"http://127.0.0.1:{port}", build, count, args.concurrency))
+        finally:
+            process.terminate()
+            process.wait()
+
+    results = {
+        "started_at": datetime.datetime.now(tz=datetime.UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "database": url.split(":", 1)[0],
+        "server": args.server,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "users": args.users,
+        "categories_per_user": args.categories,
+        "expenses": args.expenses,
+        "seed_seconds": round(seed_seconds, 1),
+        "routes": routes,
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
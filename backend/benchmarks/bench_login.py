@@ -0,0 +1,91 @@
+"""Login throughput under concurrent load, with hashing inline vs. on the process pool.
+
+While the login threads run, a probe thread keeps requesting the category
+list to show how much hashing slows down everything else. Run from the
+backend directory:
+
+    python -m benchmarks.bench_login --threads 16 --seconds 10
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import uuid
+
+from flask_jwt_extended import create_access_token
+
+from config import Config, create_app, db
+from models import User
+
+
+def run(workers, args):
+    app = create_app("testing")
+    app.config["JWT_SECRET_KEY"] = uuid.uuid4().hex
+    app.config["PASSWORD_HASH_METHOD"] = args.method
+    app.extensions["password_hasher"].method = args.method
+    app.extensions["password_hasher"].workers = workers
+
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench", password=app.extensions["password_hasher"].hash("password"))
+        db.session.add(user)
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+        user_id = user.id
+
+    stop = threading.Event()
+    logins = {"ok": 0, "busy": 0}
+    probe_latencies = []
+    lock = threading.Lock()
+
+    def login():
+        client = app.test_client()
+        while not stop.is_set():
+            response = client.post("/api/auth/login", json={"username": "bench", "password": "password"})
+            with lock:
+                logins["ok" if response.status_code == 200 else "busy"] += 1
+
+    def probe():
+        client = app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get(f"/api/category/{user_id}/categories", headers=headers)
+            probe_latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login) for _ in range(args.threads)] + [threading.Thread(target=probe)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    app.extensions["password_hasher"].shutdown()
+
+    probe_latencies.sort()
+    return {
+        "logins_per_second": round(logins["ok"] / args.seconds, 1),
+        "shed_per_second": round(logins["busy"] / args.seconds, 1),
+        "probe_p50_ms": round(statistics.median(probe_latencies), 2),
+        "probe_p95_ms": round(probe_latencies[int(len(probe_latencies) * 0.95) - 1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--pool-workers", type=int, default=None, help="Defaults to PASSWORD_HASH_WORKERS")
+    parser.add_argument("--method", default="scrypt:32768:8:1")
+    args = parser.parse_args()
+
+    pool_workers = args.pool_workers or Config.PASSWORD_HASH_WORKERS
+    print(json.dumps({
+        "inline": run(0, args),
+        f"pool_{pool_workers}": run(pool_workers, args),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
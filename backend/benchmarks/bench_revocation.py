@@ -0,0 +1,67 @@
+"""Microbenchmark of the per-request token revocation check.
+
+Compares the Bloom filter front (no query for valid tokens) against
+querying revoked_token on every request. Run from the backend directory:
+
+    python -m benchmarks.bench_revocation --revoked 100000
+"""
+import argparse
+import json
+import os
+import time
+import timeit
+import uuid
+
+from sqlalchemy import insert
+
+from config import create_app, db
+from models import RevokedToken
+from revocation import utcnow
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--revoked", type=int, default=100000)
+    parser.add_argument("--checks", type=int, default=20000)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    store = app.extensions["revocation_store"]
+    with app.app_context():
+        db.create_all()
+        expires = utcnow().replace(year=utcnow().year + 1)
+        revoked = [str(uuid.uuid4()) for _ in range(args.revoked)]
+        db.session.execute(insert(RevokedToken), [{"jti": jti, "expires_at": expires} for jti in revoked])
+        db.session.commit()
+
+        start = time.perf_counter()
+        store.rebuild()
+        rebuild_ms = (time.perf_counter() - start) * 1000
+        store.pid = os.getpid()
+
+        valid = [str(uuid.uuid4()) for _ in range(args.checks)]
+
+        def per_check_us(fn, keys):
+            iterator = iter(keys * 2)
+            return timeit.timeit(lambda: fn(next(iterator)), number=len(keys)) / len(keys) * 1e6
+
+        def db_lookup(jti):
+            return db.session.query(RevokedToken.id).filter(
+                RevokedToken.jti == jti, RevokedToken.expires_at > utcnow()
+            ).first() is not None
+
+        false_positives = sum(jti in store.filter for jti in valid)
+        results = {
+            "revoked_tokens": args.revoked,
+            "filter_bytes": len(store.filter.bits),
+            "filter_rebuild_ms": round(rebuild_ms, 1),
+            "valid_token_check_us": round(per_check_us(store.is_revoked, valid), 2),
+            "revoked_token_check_us": round(per_check_us(store.is_revoked, revoked[:args.checks // 10]), 2),
+            "db_lookup_per_request_us": round(per_check_us(db_lookup, valid[:args.checks // 10]), 2),
+            "observed_false_positive_rate": round(false_positives / len(valid), 5),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
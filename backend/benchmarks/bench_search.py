@@ -0,0 +1,90 @@
+"""Measure latency of ?q= searches on the expense list at a given row count.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_search --rows 100000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import date, timedelta, datetime, UTC
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+
+from config import create_app, db
+from models import Category, Expense, User
+
+# Each description has one common word (~5% of rows each) and two merchant names (~0.2% each).
+WORDS = ["uber", "lyft", "dentist", "groceries", "coffee", "rent", "gym", "pharmacy", "airline", "hotel",
+         "lunch", "dinner", "parking", "fuel", "books", "cinema", "insurance", "internet", "phone", "gift"]
+MERCHANTS = [f"merchant{i:04d}" for i in range(1000)]
+
+
+def seed(rows):
+    rng = random.Random(42)
+    user = User(username=f"bench-{uuid.uuid4().hex}", password="x")
+    db.session.add(user)
+    db.session.commit()
+    category = Category(user_id=user.id, category="General")
+    db.session.add(category)
+    db.session.commit()
+
+    now = datetime.now(tz=UTC)
+    start = date(2015, 1, 1)
+    for offset in range(0, rows, 10000):
+        db.session.execute(insert(Expense), [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user.id,
+                "date": start + timedelta(days=rng.randrange(3650)),
+                "category_id": category.id,
+                "amount": rng.randrange(100, 50000) / 100,
+                "description": f"{rng.choice(WORDS)} {rng.choice(MERCHANTS)} {rng.choice(MERCHANTS)} #{i}",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(offset, min(offset + 10000, rows))
+        ])
+        db.session.commit()
+    return user.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--config", default="testing")
+    args = parser.parse_args()
+
+    app = create_app(args.config)
+    app.config["JWT_SECRET_KEY"] = uuid.uuid4().hex
+    with app.app_context():
+        db.create_all()
+        user_id = seed(args.rows)
+        headers = {"Authorization": f"Bearer {create_access_token(identity=user_id)}"}
+
+    client = app.test_client()
+    results = {"rows": args.rows, "requests": args.requests}
+    for name, terms in (("selective", MERCHANTS), ("common", WORDS)):
+        timings = []
+        for i in range(args.requests):
+            term = terms[i % len(terms)]
+            start = time.perf_counter()
+            response = client.get(f"/api/expense/{user_id}/expenses?q={term}&limit=50", headers=headers)
+            timings.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+
+        timings.sort()
+        results[name] = {
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from threading import Lock
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+class VersionedLRUCache:
+    """Bounded, thread-safe LRU map of key -> (version, value).
+
+    A lookup only hits when the stored version equals the caller's current
+    version, so entries written by this worker can never outlive a change
+    committed by another worker.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, version):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, version, value):
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (version, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+def category_cache():
+    return current_app.extensions["category_cache"]
+
+def invalidate_categories_on_commit(session, user_id):
+    """Drop the user's cached categories once the session's transaction commits."""
+    session.info.setdefault("invalidate_categories", set()).add(user_id)
+
+@event.listens_for(Session, "after_commit")
+def apply_category_invalidations(session):
+    user_ids = session.info.pop("invalidate_categories", ())
+    if user_ids and has_app_context() and "category_cache" in current_app.extensions:
+        for user_id in user_ids:
+            category_cache().invalidate(user_id)
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_category_invalidations(session, previous_transaction):
+    session.info.pop("invalidate_categories", None)
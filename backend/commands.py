@@ -0,0 +1,63 @@
+import click
+from flask.cli import AppGroup, with_appcontext
+from config import db
+from hashing import password_hasher
+from models import ExpenseRollup, rebuild_search_index
+from sqlalchemy.exc import IntegrityError
+import seeding
+
+rollup_cli = AppGroup("rollup", help="Maintain the expense_rollup table.")
+search_cli = AppGroup("search", help="Maintain the expense description search index.")
+
+@rollup_cli.command("rebuild")
+def rebuild_rollup():
+    """Recompute expense_rollup from the expense table, then verify it."""
+    ExpenseRollup.rebuild()
+    db.session.commit()
+    click.echo(f"Rebuilt {ExpenseRollup.query.count()} rollup rows")
+    verify_rollup.callback()
+
+@rollup_cli.command("verify")
+def verify_rollup():
+    """Compare expense_rollup against a live aggregation of expenses."""
+    mismatches = ExpenseRollup.mismatches()
+    for user_id, month, category_id in mismatches:
+        click.echo(f"Mismatch: user={user_id} month={month} category={category_id}", err=True)
+    if mismatches:
+        raise click.ClickException(f"{len(mismatches)} rollup rows do not match the expense table")
+    click.echo("Rollup verified")
+
+@search_cli.command("rebuild")
+def rebuild_search():
+    """Repopulate the SQLite FTS index (PostgreSQL indexes need no maintenance)."""
+    rebuild_search_index()
+    db.session.commit()
+    click.echo("Search index rebuilt")
+
+@click.command("seed")
+@click.option("--users", default=100, show_default=True)
+@click.option("--categories", default=12, show_default=True, help="Per user.")
+@click.option("--expenses", default=1000000, show_default=True, help="In total, skewed towards a few heavy users.")
+@click.option("--days", default=730, show_default=True, help="Expense dates span this many days up to today.")
+@click.option("--seed", "seed_value", default=0, show_default=True, help="Same seed, same data set.")
+@click.option("--prefix", default="seed-user-", show_default=True, help="Usernames are the prefix plus a number.")
+@click.option("--password", default="password", show_default=True, help="Password of every generated user.")
+@click.option("--batch-size", default=100000, show_default=True, help="Expense rows per transaction.")
+@with_appcontext
+def seed_command(users, categories, expenses, days, seed_value, prefix, password, batch_size):
+    """Fill the database with a large synthetic data set."""
+    def progress(loaded):
+        click.echo(f"{loaded}/{expenses} expenses", err=True)
+
+    try:
+        result = seeding.seed(
+            db.session, users, categories, expenses, days=days, seed=seed_value, prefix=prefix,
+            password=password_hasher().hash(password), batch_size=batch_size, progress=progress,
+        )
+    except IntegrityError:
+        raise click.ClickException(f"Users named {prefix}* already exist; pass another --prefix or --seed")
+    rate = result["expenses"] / result["expense_seconds"] if result["expense_seconds"] else 0
+    click.echo(
+        f"Seeded {result['users']} users, {result['categories']} categories and {result['expenses']} expenses "
+        f"({rate:,.0f} expenses/s, {result['total_seconds']:.1f}s including the rollup)"
+    )
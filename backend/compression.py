@@ -0,0 +1,129 @@
+"""Negotiated gzip/Brotli compression of API responses.
+
+Responses of the expense and category blueprints with a compressible
+mimetype are compressed with the best encoding the client accepts: br
+when the optional brotli package is installed, otherwise gzip. Buffered
+bodies are compressed when they reach COMPRESSION_MIN_SIZE bytes; streamed
+ones (NDJSON lists, exports, import progress) always, incrementally, so
+clients keep receiving rows as they are produced.
+
+Compressed responses carry a weak ETag, since their bytes differ from the
+identity representation; If-None-Match is compared weakly, so both
+revalidate.
+"""
+from flask import request
+import time
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSED_BLUEPRINTS = {"expense", "category"}
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "application/x-ndjson", "application/vnd.columnar+json", "application/msgpack", "text/csv",
+}
+STREAM_FLUSH_BYTES = 64 * 1024
+STREAM_FLUSH_SECONDS = 0.2
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level):
+        # wbits=31: zlib stream with a gzip header and trailer.
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush(zlib.Z_FINISH)
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+def available_encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+def new_encoder(encoding, config):
+    if encoding == "br":
+        return BrotliEncoder(config["COMPRESSION_BROTLI_QUALITY"])
+    return GzipEncoder(config["COMPRESSION_GZIP_LEVEL"])
+
+def compress_stream(chunks, encoder):
+    """Compress an iterable of chunks, flushing after STREAM_FLUSH_BYTES or STREAM_FLUSH_SECONDS.
+
+    Flushing after every chunk would cost most of the ratio on streams that
+    yield one line per row; waiting for the end would stall slow ones.
+    """
+    pending = []
+    pending_bytes = 0
+    flushed_at = time.monotonic()
+    try:
+        for chunk in chunks:
+            pending.append(chunk.encode() if isinstance(chunk, str) else chunk)
+            pending_bytes += len(pending[-1])
+            if pending_bytes >= STREAM_FLUSH_BYTES or time.monotonic() - flushed_at >= STREAM_FLUSH_SECONDS:
+                # One call per flush; some encoders emit a block for every call.
+                yield encoder.compress(b"".join(pending)) + encoder.flush()
+                pending = []
+                pending_bytes = 0
+                flushed_at = time.monotonic()
+        yield encoder.compress(b"".join(pending)) + encoder.finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+def is_compressible(response):
+    return (
+        request.blueprint in COMPRESSED_BLUEPRINTS
+        and request.method != "HEAD"
+        and response.status_code not in (204, 206, 304)
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and "Content-Encoding" not in response.headers
+    )
+
+def init_compression(app):
+    """Compress eligible responses; with RESPONSE_COMPRESSION off nothing is registered."""
+    if not app.config["RESPONSE_COMPRESSION"]:
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if not is_compressible(response):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+
+        encoder = new_encoder(encoding, app.config)
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoder)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < app.config["COMPRESSION_MIN_SIZE"]:
+                return response
+            response.set_data(encoder.compress(body) + encoder.finish())
+        response.headers["Content-Encoding"] = encoding
+        etag, _ = response.get_etag()
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
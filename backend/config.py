@@ -6,24 +6,69 @@ from flask_jwt_extended import JWTManager
 import os
 from dotenv import load_dotenv
 from datetime import timedelta
+from pool_metrics import InstrumentedQueuePool, PoolMetrics
+from replica import REPLICA_BIND, RoutingSession
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+def engine_options(pool_size, max_overflow, pool_timeout, pool_recycle):
+    """QueuePool settings; each default can be overridden from the environment."""
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", pool_size)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", max_overflow)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", pool_timeout)),
+        # RDS and proxies drop idle connections; recycle them before that happens.
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", pool_recycle)),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
 class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     JWT_VERIFY_SUB = False
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    CATEGORY_CACHE_SIZE = int(os.getenv("CATEGORY_CACHE_SIZE", 1024))
+    # Full werkzeug method string; stored hashes with other parameters are upgraded on login.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    # Hasher processes per app process; a sync gunicorn worker never uses more than one.
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+    REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", 100000))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", 0.001))
+    REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", 5))
+    REVOCATION_REBUILD_INTERVAL = float(os.getenv("REVOCATION_REBUILD_INTERVAL", 3600))
+    # Optional read replica for GET requests.
+    REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+    # Should exceed the usual replication lag.
+    READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+    # Statements slower than this many milliseconds are logged; 0 turns the log off.
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 0))
+    PROMETHEUS_METRICS = os.getenv("PROMETHEUS_METRICS", "true").lower() == "true"
+    # When set, /metrics and /api/metrics/cache require "Authorization: Bearer <METRICS_TOKEN>".
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    # gzip/Brotli for expense and category responses; br needs the optional brotli package.
+    # Higher levels save little on JSON for much more CPU (benchmarks/bench_compression.py).
+    RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 1))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 1))
 
 class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=5, max_overflow=5, pool_timeout=10, pool_recycle=1800)
 
 class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    PASSWORD_HASH_METHOD = "scrypt:16384:8:1"
+    PASSWORD_HASH_WORKERS = 0
+    REVOCATION_SYNC_INTERVAL = 0
 
 class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=10, max_overflow=10, pool_timeout=30, pool_recycle=1800)
 
 config = {
     'development': DevelopmentConfig,
@@ -31,29 +76,84 @@ config = {
     'production': ProductionConfig
 }
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Full-text search objects differ per dialect and are managed by hand-written migrations.
+    return not (name or "").startswith(("expense_fts", "ix_expense_description_"))
+
 def create_app(config_name=None):
     load_dotenv('.flaskenv')
     if config_name is None:
         config_name = os.getenv('FLASK_CONFIG')
 
     app = Flask(__name__)
+    from json_provider import JSONProvider
+    app.json = JSONProvider(app)
     CORS(app)
-    JWTManager(app)
+    jwt = JWTManager(app)
 
     app.config.from_object(config[config_name])
+    if app.config["REPLICA_DATABASE_URL"]:
+        app.config["SQLALCHEMY_BINDS"] = {
+            **app.config.get("SQLALCHEMY_BINDS", {}),
+            REPLICA_BIND: {"url": app.config["REPLICA_DATABASE_URL"], **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})},
+        }
 
     db.init_app(app)
-    migrate.init_app(app, db, directory=os.path.join(basedir, 'database'))
+
+    from instrumentation import init_instrumentation
+    with app.app_context():
+        app.extensions["pool_metrics"] = {bind: PoolMetrics(engine) for bind, engine in db.engines.items()}
+        init_instrumentation(app, db.engines.values())
+
+    from request_metrics import init_request_metrics
+    init_request_metrics(app)
+
+    # Registered last so it runs first: the metrics above include the compression time.
+    from compression import init_compression
+    init_compression(app)
+
+    from cache import VersionedLRUCache
+    app.extensions["category_cache"] = VersionedLRUCache(app.config["CATEGORY_CACHE_SIZE"])
+
+    from revocation import RevocationStore
+    revocation_store = RevocationStore(
+        app,
+        app.config["REVOCATION_BLOOM_CAPACITY"],
+        app.config["REVOCATION_BLOOM_ERROR_RATE"],
+        app.config["REVOCATION_SYNC_INTERVAL"],
+        app.config["REVOCATION_REBUILD_INTERVAL"],
+    )
+    app.extensions["revocation_store"] = revocation_store
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return revocation_store.is_revoked(jwt_payload["jti"])
+
+    from hashing import PasswordHasher
+    app.extensions["password_hasher"] = PasswordHasher(
+        app.config["PASSWORD_HASH_METHOD"],
+        app.config["PASSWORD_HASH_WORKERS"],
+        app.config["PASSWORD_HASH_MAX_PENDING"],
+    )
+    migrate.init_app(app, db, directory=os.path.join(basedir, 'database'), include_object=include_object)
 
     from routes.expense import expense_blueprint
     from routes.category import category_blueprint
     from routes.auth import auth_blueprint
+    from routes.metrics import metrics_blueprint, prometheus_blueprint
     app.register_blueprint(expense_blueprint, url_prefix="/api/expense")
     app.register_blueprint(category_blueprint, url_prefix="/api/category")
     app.register_blueprint(auth_blueprint, url_prefix="/api/auth")
+    app.register_blueprint(metrics_blueprint, url_prefix="/api/metrics")
+    app.register_blueprint(prometheus_blueprint)
+
+    from commands import rollup_cli, search_cli, seed_command
+    app.cli.add_command(rollup_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(seed_command)
 
     return app
 
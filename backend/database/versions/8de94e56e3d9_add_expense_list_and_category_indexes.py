@@ -0,0 +1,58 @@
+"""add expense list and category indexes
+
+Revision ID: 8de94e56e3d9
+Revises: 02629f6d1bb2
+Create Date: 2026-10-18 01:41:20.403311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8de94e56e3d9'
+down_revision = '02629f6d1bb2'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_expense_user_id_date_id', ['user_id', 'date', 'id']),
+    ('ix_expense_category_id', ['category_id']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # SQLite ignores VARCHAR lengths, so only the indexes are added; altering
+        # the column would rebuild the table and drop the expense_fts triggers.
+        for name, columns in INDEXES:
+            op.create_index(name, 'expense', columns)
+        return
+
+    # Same type as category.id. Adding a length rewrites the table under an
+    # exclusive lock, so it runs first and the new indexes are built only once.
+    op.alter_column(
+        'expense', 'category_id',
+        existing_type=sa.String(), type_=sa.String(length=36), existing_nullable=False,
+    )
+    # Concurrent builds keep the table writable but cannot run in a transaction.
+    # A failed one leaves an invalid index behind, which is dropped on retry.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.drop_index(name, table_name='expense', postgresql_concurrently=True, if_exists=True)
+            op.create_index(name, 'expense', columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='expense')
+        return
+
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='expense', postgresql_concurrently=True, if_exists=True)
+    op.alter_column(
+        'expense', 'category_id',
+        existing_type=sa.String(length=36), type_=sa.String(), existing_nullable=False,
+    )
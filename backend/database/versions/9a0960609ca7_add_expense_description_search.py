@@ -0,0 +1,65 @@
+"""Add expense description search
+
+Revision ID: 9a0960609ca7
+Revises: 797b807b4201
+Create Date: 2026-10-18 01:12:40.118274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a0960609ca7'
+down_revision = '797b807b4201'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            'ix_expense_description_tsv', 'expense',
+            [sa.text("to_tsvector('simple', description)")],
+            postgresql_using='gin',
+        )
+        op.create_index(
+            'ix_expense_description_trgm', 'expense', ['description'],
+            postgresql_using='gin',
+            postgresql_ops={'description': 'gin_trgm_ops'},
+        )
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE expense_fts USING fts5("
+        "expense_id UNINDEXED, description, tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER expense_fts_insert AFTER INSERT ON expense BEGIN "
+        "INSERT INTO expense_fts (rowid, expense_id, description) VALUES (new.rowid, new.id, new.description); END"
+    )
+    op.execute(
+        "CREATE TRIGGER expense_fts_delete AFTER DELETE ON expense BEGIN "
+        "DELETE FROM expense_fts WHERE rowid = old.rowid; END"
+    )
+    op.execute(
+        "CREATE TRIGGER expense_fts_update AFTER UPDATE OF description ON expense BEGIN "
+        "UPDATE expense_fts SET description = new.description WHERE rowid = old.rowid; END"
+    )
+    op.execute(
+        "INSERT INTO expense_fts (rowid, expense_id, description) "
+        "SELECT rowid, id, description FROM expense"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_expense_description_trgm', table_name='expense')
+        op.drop_index('ix_expense_description_tsv', table_name='expense')
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS expense_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS expense_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS expense_fts_insert")
+    op.execute("DROP TABLE IF EXISTS expense_fts")
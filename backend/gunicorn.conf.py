@@ -0,0 +1,123 @@
+"""Production gunicorn profile; gunicorn reads it from the working directory.
+
+    GUNICORN_WORKER_CLASS=gthread gunicorn
+
+The app is built once in the master by config.create_app and forked into
+the workers, so they start fast and share its memory copy-on-write. Each
+worker disposes the inherited engines after the fork and opens its own
+connections. GUNICORN_WORKER_CLASS picks the concurrency model, and the
+database pool of every worker is sized for it unless DB_POOL_SIZE and
+DB_MAX_OVERFLOW are set:
+
+- sync: one request at a time per worker, 2 * CPUs + 1 workers.
+- gthread: GUNICORN_THREADS requests per worker, CPUs + 1 workers.
+- gevent: up to GUNICORN_WORKER_CONNECTIONS greenlets per worker, CPUs
+  workers. Requires gevent (and psycogreen for PostgreSQL, otherwise
+  every query blocks the worker); the pool bounds how many greenlets
+  query at once.
+
+PASSWORD_HASH_WORKERS defaults to one hasher process per sync worker and
+two per gthread or gevent worker.
+
+The database can accept at most workers * (pool size + overflow)
+connections from one server; the total is logged at startup.
+"""
+import gc
+import glob
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+cpus = multiprocessing.cpu_count()
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+if worker_class not in ("sync", "gthread", "gevent"):
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS must be sync, gthread or gevent, not {worker_class!r}")
+
+threads = int(os.getenv("GUNICORN_THREADS", 4)) if worker_class == "gthread" else 1
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 100))
+default_workers = {"sync": 2 * cpus + 1, "gthread": cpus + 1, "gevent": cpus}[worker_class]
+workers = int(os.getenv("GUNICORN_WORKERS", default_workers))
+
+# A request needs one connection per engine; the revocation sync thread
+# and filter rebuilds take one more.
+pool_size, max_overflow = {
+    "sync": (2, 0),
+    "gthread": (threads + 1, threads),
+    "gevent": (10, 10),
+}[worker_class]
+os.environ.setdefault("DB_POOL_SIZE", str(pool_size))
+os.environ.setdefault("DB_MAX_OVERFLOW", str(max_overflow))
+# Password hasher processes per worker: a sync worker hashes one request at a time.
+hash_workers = {"sync": 1, "gthread": min(threads, 2), "gevent": 2}[worker_class]
+os.environ.setdefault("PASSWORD_HASH_WORKERS", str(hash_workers))
+
+if worker_class == "gevent":
+    # The app is imported in the master, so it must see the patched modules.
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        pass
+    else:
+        patch_psycopg()
+
+# Every worker writes its Prometheus samples here and /metrics adds them up.
+# It must be set before the app imports prometheus_client, and samples of a
+# previous run must not be counted.
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+    for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(path)
+    created_multiproc_dir = None
+else:
+    created_multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="gunicorn-prometheus-")
+
+wsgi_app = "config:create_app()"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+if preload_app:
+    # No collections in the master, so the preloaded objects stay packed
+    # and are frozen before each fork (see pre_fork).
+    gc.disable()
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+accesslog = os.getenv("GUNICORN_ACCESS_LOG")
+
+
+def when_ready(server):
+    server.log.info(
+        "%s workers (%s), up to %s connections per database engine in total",
+        workers, worker_class, workers * (int(os.environ["DB_POOL_SIZE"]) + int(os.environ["DB_MAX_OVERFLOW"])),
+    )
+
+
+def pre_fork(server, worker):
+    # Collections in the workers would otherwise write to every object
+    # inherited from the master and unshare the pages holding them.
+    if server.cfg.preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """Drop the pooled connections inherited from the master without closing them under it."""
+    if not server.cfg.preload_app:
+        return
+    gc.enable()
+    from config import db
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    if created_multiproc_dir:
+        shutil.rmtree(created_multiproc_dir, ignore_errors=True)
@@ -0,0 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor
+from threading import BoundedSemaphore, Lock
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+import multiprocessing
+import os
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full and the request should be shed."""
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+def _verify(stored, password):
+    return check_password_hash(stored, password)
+
+def pool_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+class PasswordHasher:
+    """Runs password hashing on a bounded process pool.
+
+    At most max_pending hash/verify calls may be queued or running per
+    worker process; beyond that HasherBusy is raised instead of letting a
+    login burst pile up behind the pool. With workers=0 the work runs
+    inline, which is what the tests use.
+    """
+
+    def __init__(self, method, workers, max_pending):
+        self.method = method
+        self.workers = workers
+        self.slots = BoundedSemaphore(max(max_pending, 1))
+        self.lock = Lock()
+        self.pool = None
+        self.pool_pid = None
+
+    def _executor(self):
+        # A pool inherited through fork (e.g. gunicorn --preload) is unusable; start one per process.
+        # Hashers are started by a forkserver rather than forked from this process, which runs
+        # threads (revocation sync, gthread workers); unlike fork, it also starts them on demand.
+        with self.lock:
+            if self.pool is None or self.pool_pid != os.getpid():
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+                self.pool_pid = os.getpid()
+            return self.pool
+
+    def _run(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            if self.workers <= 0:
+                return fn(*args)
+            return self._executor().submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(_hash, password, self.method)
+
+    def verify(self, stored, password):
+        return self._run(_verify, stored, password)
+
+    def needs_rehash(self, stored):
+        """True when stored was produced with different hashing parameters than configured."""
+        return stored.split("$", 1)[0] != self.method
+
+    def shutdown(self):
+        with self.lock:
+            if self.pool is not None and self.pool_pid == os.getpid():
+                self.pool.shutdown()
+            self.pool = None
+
+def password_hasher():
+    return current_app.extensions["password_hasher"]
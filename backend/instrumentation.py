@@ -0,0 +1,104 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+import json
+import logging
+import time
+
+slow_query_logger = logging.getLogger("slow_query")
+
+class RequestTimings:
+    __slots__ = ("started", "statements", "sql_seconds", "json_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.json_seconds = 0.0
+
+    def server_timing(self):
+        total = time.perf_counter() - self.started
+        return ", ".join([
+            f'db;desc="{self.statements} statements";dur={self.sql_seconds * 1000:.2f}',
+            f"json;dur={self.json_seconds * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ])
+
+def current_timings():
+    return g.get("timings") if has_request_context() else None
+
+class TimedJSONMixin:
+    """Adds the time spent in dumps to the request's timings."""
+
+    def dumps(self, obj, **kwargs):
+        timings = current_timings()
+        if timings is None:
+            return super().dumps(obj, **kwargs)
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            timings.json_seconds += time.perf_counter() - start
+
+def instrument_engine(engine, slow_query_seconds):
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        context.started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def end_statement(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.started
+        timings = current_timings()
+        if timings is not None:
+            timings.statements += 1
+            timings.sql_seconds += elapsed
+        if slow_query_seconds and elapsed >= slow_query_seconds:
+            # Parameters are left out: they may hold password hashes and other user data.
+            slow_query_logger.warning(json.dumps({
+                "event": "slow_query",
+                "duration_ms": round(elapsed * 1000, 2),
+                "statement": " ".join(statement.split())[:2000],
+                "executemany": executemany,
+                "rowcount": cursor.rowcount,
+                "endpoint": request.endpoint if has_request_context() else None,
+                "method": request.method if has_request_context() else None,
+                "path": request.path if has_request_context() else None,
+            }))
+
+def collects_timings(app):
+    return app.config["SERVER_TIMING"] or app.config["PROMETHEUS_METRICS"]
+
+def instrument_engines(app, engines):
+    """Time the statements of engines if request timings or the slow query log are on."""
+    slow_query_seconds = app.config["SLOW_QUERY_MS"] / 1000
+    if collects_timings(app) or slow_query_seconds:
+        for engine in engines:
+            instrument_engine(engine, slow_query_seconds)
+
+def init_instrumentation(app, engines):
+    """Time SQL statements and JSON serialization per request.
+
+    The timings are collected for SERVER_TIMING, which puts the statement
+    count, SQL time, serialization time and total time into a
+    Server-Timing response header (for streamed responses, up to the moment
+    the headers are sent), and for the Prometheus request metrics. With
+    SLOW_QUERY_MS every slower statement is logged as one JSON line. When
+    all of them are off nothing is registered, so requests pay nothing.
+    """
+    instrument_engines(app, engines)
+    if not collects_timings(app):
+        return
+
+    provider = type(app.json)
+    app.json = type(f"Timed{provider.__name__}", (TimedJSONMixin, provider), {})(app)
+
+    @app.before_request
+    def start_timings():
+        g.timings = RequestTimings()
+
+    if app.config["SERVER_TIMING"]:
+        @app.after_request
+        def add_server_timing(response):
+            timings = current_timings()
+            if timings is not None:
+                response.headers["Server-Timing"] = timings.server_timing()
+            return response
@@ -0,0 +1,57 @@
+"""JSON provider encoding Decimal, date and datetime natively, with orjson when installed.
+
+Dates and datetimes are written as ISO 8601 ("2025-03-24",
+"2025-03-24T12:30:00"), like the createdAt fields, instead of Flask's HTTP
+dates. Decimals are written as their exact string, as Flask does. Keys are
+sorted, non-ASCII text is written as UTF-8, and output is compact outside
+debug mode, for jsonify and dumps alike. Without orjson, or for values
+orjson rejects (such as integers beyond 64 bits), the json module produces
+the same output.
+"""
+from datetime import date
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def default(o):
+    if isinstance(o, date):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return str(o)
+    return DefaultJSONProvider.default(o)
+
+class JSONProvider(DefaultJSONProvider):
+    default = staticmethod(default)
+    ensure_ascii = False
+
+    def indented(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Explicit json.dumps arguments.
+            return super().dumps(obj, **kwargs)
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if self.indented():
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=default, option=option).decode()
+            except orjson.JSONEncodeError:
+                pass
+        return super().dumps(obj, **({"indent": 2} if self.indented() else {"separators": (",", ":")}))
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(f"{self.dumps(obj)}\n", mimetype=self.mimetype)
@@ -1,11 +1,26 @@
 from config import db
-from datetime import datetime, UTC
+from datetime import date, datetime, UTC
+from decimal import Decimal
+from sqlalchemy import DDL, Date, cast, column, delete, event, func, insert, literal_column, or_, select, table, text
+from sqlalchemy.dialects import postgresql, sqlite
 import uuid
 
+# SQLite FTS5 table, created by the DDL listeners below rather than mapped.
+expense_fts = table("expense_fts", column("expense_id"), column("rank"))
+
+def upsert_insert(model):
+    """Dialect specific INSERT supporting ON CONFLICT clauses (PostgreSQL or SQLite)."""
+    dialect = postgresql if db.session.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
+
 class User(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     username = db.Column(db.String(80), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
+    data_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Bumped by category writes only; keys the cached category lists.
+    category_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    last_write_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.now(tz=UTC), nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.now(tz=UTC), onupdate=datetime.now(tz=UTC), nullable=False)
     expenses = db.relationship('Expense', backref='user', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
@@ -17,6 +32,13 @@ class User(db.Model):
             "username": self.username
         }
 
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_token'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
 class Category(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
@@ -25,6 +47,7 @@ class Category(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.now(tz=UTC), onupdate=datetime.now(tz=UTC), nullable=False)
     expenses = db.relationship('Expense', backref='category', lazy=True, passive_deletes=True)
 
+    # The unique index also serves the category list's filter on user_id.
     __table_args__ = (
         db.UniqueConstraint('user_id', 'category', name='unique_category_per_user_constraint'),
     )
@@ -41,12 +64,31 @@ class Expense(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     date = db.Column(db.Date, nullable=False)
-    category_id = db.Column(db.String, db.ForeignKey('category.id', ondelete='RESTRICT'), nullable=False)
+    category_id = db.Column(db.String(36), db.ForeignKey('category.id', ondelete='RESTRICT'), nullable=False)
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     description = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now(tz=UTC), nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.now(tz=UTC), onupdate=datetime.now(tz=UTC), nullable=False)
 
+    __table_args__ = (
+        # The list, its cursor pages and exports: one user's expenses in (date, id) order.
+        db.Index('ix_expense_user_id_date_id', 'user_id', 'date', 'id'),
+        # Category filters, and the RESTRICT check when a category is deleted.
+        db.Index('ix_expense_category_id', 'category_id'),
+        # PostgreSQL search indexes; SQLite uses the expense_fts table created below.
+        db.Index(
+            'ix_expense_description_tsv',
+            text("to_tsvector('simple', description)"),
+            postgresql_using='gin',
+        ).ddl_if(dialect='postgresql'),
+        db.Index(
+            'ix_expense_description_trgm',
+            'description',
+            postgresql_using='gin',
+            postgresql_ops={'description': 'gin_trgm_ops'},
+        ).ddl_if(dialect='postgresql'),
+    )
+
     def to_json(self):
         return {
             "id": self.id,
@@ -55,4 +97,222 @@ class Expense(db.Model):
             "Category": self.category.category,
             "Amount": float(self.amount),
             "Description": self.description
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def list_columns():
+        """Only the columns needed for the list, including the joined category name."""
+        return (Expense.id, Expense.user_id, Expense.date, Category.category, Expense.amount, Expense.description)
+
+    @staticmethod
+    def list_query(*filters):
+        return db.session.query(*Expense.list_columns()).join(Category, Expense.category_id == Category.id).filter(*filters)
+
+    @staticmethod
+    def list_select(*filters):
+        """list_query as a select() statement, for sessions other than db.session."""
+        return select(*Expense.list_columns()).join(Category, Expense.category_id == Category.id).where(*filters)
+
+    @staticmethod
+    def row_to_json(row):
+        """Same output as to_json, built from a list_query row tuple."""
+        return {
+            "id": row.id,
+            "user_id": row.user_id,
+            "Date": row.date,
+            "Category": row.category,
+            "Amount": float(row.amount),
+            "Description": row.description
+        }
+
+    @staticmethod
+    def search(query, q):
+        """Restrict a list_query to expenses whose description matches q, ranked best first."""
+        if db.session.get_bind().dialect.name == "postgresql":
+            tsv = func.to_tsvector(text("'simple'"), Expense.description)
+            tsq = func.plainto_tsquery(text("'simple'"), q)
+            pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rank = func.ts_rank(tsv, tsq) + func.similarity(Expense.description, q)
+            return query.filter(or_(tsv.op("@@")(tsq), Expense.description.ilike(pattern))).order_by(rank.desc(), Expense.id)
+
+        # Every word becomes a quoted prefix term, so FTS5 query syntax in q is never interpreted.
+        terms = " ".join('"' + word.replace('"', '""') + '"*' for word in q.split())
+        return (
+            query.join(expense_fts, expense_fts.c.expense_id == Expense.id)
+            .filter(literal_column("expense_fts").op("MATCH")(terms))
+            .order_by(expense_fts.c.rank, Expense.id)
+        )
+
+# SQLite full-text index over descriptions, kept in sync by triggers. The FTS
+# rowid mirrors expense.rowid; run `flask search rebuild` after a VACUUM.
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE expense_fts USING fts5(expense_id UNINDEXED, description, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER expense_fts_insert AFTER INSERT ON expense BEGIN "
+    "INSERT INTO expense_fts (rowid, expense_id, description) VALUES (new.rowid, new.id, new.description); END",
+    "CREATE TRIGGER expense_fts_delete AFTER DELETE ON expense BEGIN "
+    "DELETE FROM expense_fts WHERE rowid = old.rowid; END",
+    "CREATE TRIGGER expense_fts_update AFTER UPDATE OF description ON expense BEGIN "
+    "UPDATE expense_fts SET description = new.description WHERE rowid = old.rowid; END",
+]
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Expense.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Expense.__table__, "before_drop", DDL("DROP TABLE IF EXISTS expense_fts").execute_if(dialect="sqlite"))
+event.listen(db.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
+def rebuild_search_index():
+    if db.session.get_bind().dialect.name != "sqlite":
+        return
+    db.session.execute(text("DELETE FROM expense_fts"))
+    db.session.execute(text(
+        "INSERT INTO expense_fts (rowid, expense_id, description) SELECT rowid, id, description FROM expense"
+    ))
+
+class ExpenseRollup(db.Model):
+    __tablename__ = 'expense_rollup'
+
+    user_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    category_id = db.Column(db.String(36), db.ForeignKey('category.id', ondelete='CASCADE'), primary_key=True)
+    total = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_json(self):
+        return {
+            "Month": self.month.strftime("%Y-%m"),
+            "categoryId": self.category_id,
+            "Total": float(self.total),
+            "Count": self.count
+        }
+
+    @staticmethod
+    def month_of(column):
+        """SQL expression truncating a date column to the first of its month."""
+        if db.session.get_bind().dialect.name == "postgresql":
+            return cast(func.date_trunc("month", column), Date)
+        return func.strftime("%Y-%m-01", column)
+
+    @staticmethod
+    def apply_deltas(deltas):
+        """Add total/count deltas to rollup cells in the current transaction.
+
+        deltas is a list of dicts keyed by the table's columns; all of them
+        go through one executemany upsert.
+        """
+        if not deltas:
+            return
+        stmt = upsert_insert(ExpenseRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "month", "category_id"],
+            set_={
+                "total": ExpenseRollup.total + stmt.excluded.total,
+                "count": ExpenseRollup.count + stmt.excluded.count,
+            },
+        )
+        db.session.execute(stmt, deltas)
+        if any(delta["count"] < 0 for delta in deltas):
+            db.session.execute(delete(ExpenseRollup).where(
+                ExpenseRollup.user_id.in_({delta["user_id"] for delta in deltas}),
+                ExpenseRollup.count <= 0,
+            ))
+
+    @staticmethod
+    def apply_delta(user_id, expense_date, category_id, amount, count):
+        ExpenseRollup.apply_deltas([{
+            "user_id": user_id,
+            "month": expense_date.replace(day=1),
+            "category_id": category_id,
+            "total": Decimal(str(amount)),
+            "count": count,
+        }])
+
+    @staticmethod
+    def add_expense(expense):
+        ExpenseRollup.apply_delta(expense.user_id, expense.date, expense.category_id, expense.amount, 1)
+
+    @staticmethod
+    def add_expenses(rows):
+        """Apply a batch of new expense dicts with one delta per rollup cell."""
+        cells = {}
+        for row in rows:
+            key = (row["user_id"], row["date"].replace(day=1), row["category_id"])
+            total, count = cells.get(key, (Decimal(0), 0))
+            cells[key] = (total + Decimal(str(row["amount"])), count + 1)
+        ExpenseRollup.apply_deltas([
+            {"user_id": user_id, "month": month, "category_id": category_id, "total": total, "count": count}
+            for (user_id, month, category_id), (total, count) in cells.items()
+        ])
+
+    @staticmethod
+    def cells(*filters):
+        """Per-cell totals of the expenses matching filters, as delta dicts."""
+        month = ExpenseRollup.month_of(Expense.date)
+        rows = db.session.query(
+            Expense.user_id,
+            month.label("month"),
+            Expense.category_id,
+            func.sum(Expense.amount).label("total"),
+            func.count().label("count"),
+        ).filter(*filters).group_by(Expense.user_id, month, Expense.category_id)
+        return [
+            {
+                "user_id": row.user_id,
+                "month": date.fromisoformat(row.month) if isinstance(row.month, str) else row.month,
+                "category_id": row.category_id,
+                "total": Decimal(str(row.total)),
+                "count": row.count,
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def merge_deltas(*delta_lists):
+        """Combine delta lists so each cell appears once, dropping no-op cells."""
+        cells = {}
+        for delta in (delta for deltas in delta_lists for delta in deltas):
+            key = (delta["user_id"], delta["month"], delta["category_id"])
+            total, count = cells.get(key, (Decimal(0), 0))
+            cells[key] = (total + delta["total"], count + delta["count"])
+        return [
+            {"user_id": user_id, "month": month, "category_id": category_id, "total": total, "count": count}
+            for (user_id, month, category_id), (total, count) in cells.items()
+            if total or count
+        ]
+
+    @staticmethod
+    def remove_expense(expense):
+        ExpenseRollup.apply_delta(expense.user_id, expense.date, expense.category_id, -Decimal(str(expense.amount)), -1)
+
+    @staticmethod
+    def aggregate_query():
+        """Live monthly totals per category computed from the expense table."""
+        month = ExpenseRollup.month_of(Expense.date)
+        return db.session.query(
+            Expense.user_id,
+            month.label("month"),
+            Expense.category_id,
+            func.sum(Expense.amount).label("total"),
+            func.count().label("count"),
+        ).group_by(Expense.user_id, month, Expense.category_id)
+
+    @staticmethod
+    def rebuild():
+        db.session.execute(delete(ExpenseRollup))
+        db.session.execute(insert(ExpenseRollup).from_select(
+            ["user_id", "month", "category_id", "total", "count"],
+            ExpenseRollup.aggregate_query(),
+        ))
+
+    @staticmethod
+    def mismatches():
+        """Return the (user_id, month, category_id) keys where the table disagrees with the live data."""
+        def key(row):
+            month = row.month if isinstance(row.month, str) else row.month.isoformat()
+            return (row.user_id, month, row.category_id)
+
+        def value(row):
+            return (Decimal(str(row.total)).quantize(Decimal("0.01")), row.count)
+
+        expected = {key(row): value(row) for row in ExpenseRollup.aggregate_query()}
+        actual = {key(row): value(row) for row in ExpenseRollup.query}
+        return sorted(k for k in expected.keys() | actual.keys() if expected.get(k) != actual.get(k))
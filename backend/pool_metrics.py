@@ -0,0 +1,128 @@
+from bisect import bisect_left
+from threading import Lock
+from flask import current_app
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+import time
+
+# Upper bounds in seconds of the checkout latency histogram.
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long every checkout took to its PoolMetrics.
+
+    The time includes waiting for a free connection, opening a new one and
+    the pre-ping. A checkout counts as a wait when it found no idle
+    connection and no overflow room left, i.e. it had to queue.
+    """
+
+    metrics = None
+
+    def connect(self):
+        if self.metrics is None:
+            return super().connect()
+        queued = self.checkedin() == 0 and 0 <= self._max_overflow <= self.overflow()
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        finally:
+            self.metrics.record_checkout(time.perf_counter() - start, queued)
+
+    def recreate(self):
+        # engine.dispose() replaces the pool; keep reporting to the same metrics.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class PoolMetrics:
+    """Connection pool counters and gauges of one engine in this worker process.
+
+    Connections in use, new connections and invalidations are collected
+    from pool events, so they work with any pool class. Checkout latency,
+    waits and timeouts need the engine to use InstrumentedQueuePool.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock = Lock()
+        self.in_use = 0
+        self.in_use_max = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.checkout_seconds = 0.0
+        self.checkout_seconds_max = 0.0
+        self.checkout_buckets = [0] * (len(CHECKOUT_BUCKETS) + 1)
+
+        event.listen(engine, "connect", self.on_connect)
+        event.listen(engine, "checkout", self.on_checkout)
+        event.listen(engine, "checkin", self.on_checkin)
+        event.listen(engine, "invalidate", self.on_invalidate)
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.metrics = self
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self.lock:
+            self.in_use += 1
+            self.in_use_max = max(self.in_use_max, self.in_use)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.in_use -= 1
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self.lock:
+            self.invalidations += 1
+
+    def record_checkout(self, seconds, queued):
+        with self.lock:
+            self.checkouts += 1
+            self.waits += queued
+            self.checkout_seconds += seconds
+            self.checkout_seconds_max = max(self.checkout_seconds_max, seconds)
+            self.checkout_buckets[bisect_left(CHECKOUT_BUCKETS, seconds)] += 1
+
+    def record_timeout(self):
+        with self.lock:
+            self.timeouts += 1
+
+    def stats(self):
+        pool = self.engine.pool
+        with self.lock:
+            stats = {
+                "pool": type(pool).__name__,
+                "in_use": self.in_use,
+                "in_use_max": self.in_use_max,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "checkout_seconds_sum": round(self.checkout_seconds, 6),
+                "checkout_seconds_max": round(self.checkout_seconds_max, 6),
+                # Cumulative counts per upper bound, as in a Prometheus histogram.
+                "checkout_seconds_buckets": dict(zip(
+                    [str(bound) for bound in CHECKOUT_BUCKETS] + ["+Inf"],
+                    [sum(self.checkout_buckets[:i + 1]) for i in range(len(self.checkout_buckets))],
+                )),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+            )
+        return stats
+
+def pool_metrics():
+    return current_app.extensions["pool_metrics"]
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import select
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = "replica"
+READ_METHODS = ("GET", "HEAD")
+
+class RoutingSession(Session):
+    """Session that sends the queries of read-only requests to the replica bind.
+
+    Requests other than GET/HEAD, DML and flushes always use the primary,
+    and once a request has written, the rest of it stays there. A GET for
+    a user who wrote within READ_YOUR_WRITES_SECONDS reads the primary too,
+    so replication lag never hides a user's own change from them.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and REPLICA_BIND in self._db.engines and has_request_context():
+            if self._flushing or isinstance(clause, UpdateBase):
+                g.read_from_replica = False
+            elif request.method in READ_METHODS and self._read_from_replica():
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _read_from_replica(self):
+        if "read_from_replica" not in g:
+            user_id = (request.view_args or {}).get("user_id")
+            g.read_from_replica = user_id is None or not self._wrote_recently(user_id)
+        return g.read_from_replica
+
+    def _wrote_recently(self, user_id):
+        from models import User
+        row = self.execute(
+            select(User.data_version, User.last_write_at).where(User.id == user_id),
+            bind_arguments={"bind": self._db.engines[None]},
+        ).first()
+        if row is None or not wrote_within(row.last_write_at, current_app.config["READ_YOUR_WRITES_SECONDS"]):
+            return False
+        # Reads stay on the primary, so its version is the one matching the data served.
+        g.setdefault("data_versions", {})[user_id] = row.data_version
+        return True
+
+def wrote_within(last_write_at, seconds):
+    from revocation import utcnow
+    return last_write_at is not None and last_write_at > utcnow() - timedelta(seconds=seconds)
@@ -0,0 +1,82 @@
+"""Prometheus metrics of the HTTP API, served at /metrics.
+
+With PROMETHEUS_MULTIPROC_DIR set in the environment before the app is
+imported, each worker process writes its samples to files in that
+directory and /metrics adds up the files of all workers, so whichever
+worker answers the scrape reports the whole server. The directory must be
+emptied before the server starts, and gunicorn's child_exit hook must call
+prometheus_client.multiprocess.mark_process_dead for the worker's pid;
+gunicorn.conf.py does both.
+"""
+from flask import g, request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+import os
+import resource
+import time
+
+ROUTE_LABELS = ["blueprint", "endpoint", "method"]
+MEMORY_SAMPLE_INTERVAL = 1.0
+
+REQUESTS = Counter("http_requests_total", "Requests by route and response status.", ROUTE_LABELS + ["status"])
+ERRORS = Counter("http_request_errors_total", "Requests answered with a 5xx status.", ROUTE_LABELS)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from the start of the request until its response is ready.",
+    ROUTE_LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements run per request.",
+    ROUTE_LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+MEMORY = Gauge(
+    "worker_resident_memory_bytes",
+    "Resident memory of the worker processes.",
+    multiprocess_mode="livesum",
+)
+memory_sampled_at = 0.0
+
+def resident_memory():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current memory, where /proc is unavailable.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def sample_memory():
+    global memory_sampled_at
+    now = time.monotonic()
+    if now - memory_sampled_at >= MEMORY_SAMPLE_INTERVAL:
+        memory_sampled_at = now
+        MEMORY.set(resident_memory())
+
+def render():
+    """Exposition of this process, or of all workers in multiprocess mode."""
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def init_request_metrics(app):
+    """Record every request; relies on the timings started by the instrumentation hooks."""
+    if not app.config["PROMETHEUS_METRICS"]:
+        return
+
+    @app.after_request
+    def record_request(response):
+        timings = g.get("timings")
+        if timings is None:
+            return response
+        labels = (request.blueprint or "", request.endpoint or "", request.method)
+        REQUESTS.labels(*labels, str(response.status_code)).inc()
+        if response.status_code >= 500:
+            ERRORS.labels(*labels).inc()
+        LATENCY.labels(*labels).observe(time.perf_counter() - timings.started)
+        STATEMENTS.labels(*labels).observe(timings.statements)
+        sample_memory()
+        return response
@@ -0,0 +1,133 @@
+from datetime import datetime, UTC
+from threading import Event, Lock, Thread
+from flask import current_app
+from sqlalchemy import delete, select
+from config import db
+from models import RevokedToken, upsert_insert
+import hashlib
+import math
+import os
+import time
+
+# Ids from concurrent transactions can commit out of order; re-read this many behind the last seen id.
+SYNC_OVERLAP = 1000
+
+def utcnow():
+    # revoked_token stores naive UTC timestamps.
+    return datetime.now(tz=UTC).replace(tzinfo=None)
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class RevocationStore:
+    """Denylist of revoked JWT ids.
+
+    The exact set lives in the revoked_token table; each worker keeps a
+    Bloom filter of it. A token absent from the filter is not revoked and
+    is accepted without any query. Only filter hits (revoked tokens and the
+    configured false positive rate) are confirmed against the table.
+
+    Revocations made by other workers are picked up by a background thread
+    every sync_interval seconds. The filter is rebuilt from unexpired rows
+    every rebuild_interval seconds so expired tokens drop out of it.
+    """
+
+    def __init__(self, app, capacity, error_rate, sync_interval, rebuild_interval):
+        self.app = app
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.lock = Lock()
+        self.filter = None
+        self.last_id = 0
+        self.loaded_at = 0
+        self.pid = None
+        self.stop = Event()
+
+    def _ensure_loaded(self):
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.rebuild()
+            self.pid = os.getpid()
+            if self.sync_interval > 0:
+                Thread(target=self._sync_forever, daemon=True, name="revocation-sync").start()
+
+    def _sync_forever(self):
+        while not self.stop.wait(self.sync_interval):
+            try:
+                with self.app.app_context():
+                    if time.monotonic() - self.loaded_at > self.rebuild_interval:
+                        self.rebuild()
+                    else:
+                        self.sync()
+            except Exception:
+                self.app.logger.exception("Revocation sync failed")
+
+    def rebuild(self):
+        """Drop expired rows and rebuild the filter from the remaining ones."""
+        # Own connection, so nothing pending in the request's session is committed with it.
+        with db.engine.begin() as connection:
+            connection.execute(delete(RevokedToken).where(RevokedToken.expires_at <= utcnow()))
+            rows = connection.execute(select(RevokedToken.id, RevokedToken.jti)).all()
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        for _, jti in rows:
+            bloom.add(jti)
+        self.filter = bloom
+        self.last_id = max((row_id for row_id, _ in rows), default=0)
+        self.loaded_at = time.monotonic()
+
+    def sync(self):
+        """Add rows revoked since the last sync, possibly by other workers."""
+        with db.engine.connect() as connection:
+            rows = connection.execute(
+                select(RevokedToken.id, RevokedToken.jti).where(RevokedToken.id > self.last_id - SYNC_OVERLAP)
+            ).all()
+        for row_id, jti in rows:
+            self.filter.add(jti)
+            self.last_id = max(self.last_id, row_id)
+
+    def revoke(self, jti, expires):
+        """Record the revocation in the current transaction; the caller commits."""
+        self._ensure_loaded()
+        # A token revoked twice (a repeated logout) keeps its first row.
+        db.session.execute(
+            upsert_insert(RevokedToken)
+            .values(jti=jti, expires_at=datetime.fromtimestamp(expires, tz=UTC).replace(tzinfo=None))
+            .on_conflict_do_nothing(index_elements=["jti"])
+        )
+        self.filter.add(jti)
+
+    def is_revoked(self, jti):
+        self._ensure_loaded()
+        if jti not in self.filter:
+            return False
+        # Always the primary: a lagging replica could still accept a token revoked a moment ago.
+        return db.session.execute(
+            select(RevokedToken.id).where(RevokedToken.jti == jti, RevokedToken.expires_at > utcnow()),
+            bind_arguments={"bind": db.engine},
+        ).first() is not None
+
+def revocation_store():
+    return current_app.extensions["revocation_store"]
@@ -1,11 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from models import User
 from config import db
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, create_refresh_token, get_jwt_identity, jwt_required
+from hashing import HasherBusy, password_hasher
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token, get_jwt_identity, jwt_required
+from jwt.exceptions import PyJWTError
+from revocation import revocation_store
 
 auth_blueprint = Blueprint("auth", __name__)
 
+@auth_blueprint.errorhandler(HasherBusy)
+def hasher_busy(e):
+    return jsonify({"message": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+
 @auth_blueprint.route("/register", methods=["POST"])
 def register():
     data = request.get_json()
@@ -19,7 +25,7 @@ def register():
     if existing_user:
         return jsonify({"message": "User already exists"}), 400
 
-    new_user = User(username=username, password=generate_password_hash(password))
+    new_user = User(username=username, password=password_hasher().hash(password))
     db.session.add(new_user)
     db.session.commit()
 
@@ -35,9 +41,13 @@ def login():
         return jsonify({"message": "Username and password are required"}), 400
 
     user = User.query.filter_by(username=username).first()
-    if not user or not check_password_hash(user.password, password):
+    if not user or not password_hasher().verify(user.password, password):
         return jsonify({"message": "Invalid credentials"}), 401
 
+    if password_hasher().needs_rehash(user.password):
+        user.password = password_hasher().hash(password)
+        db.session.commit()
+
     access_token = create_access_token(identity=user.id)
     refresh_token = create_refresh_token(identity=user.id)
     
@@ -63,4 +73,24 @@ def refresh():
 
 @auth_blueprint.route("/logout", methods=["POST"])
 def logout():
-    return jsonify({"message": "Logout successful"}), 200
\ No newline at end of file
+    # Revoke the bearer token (access or refresh) and, if sent, the refresh token in the body.
+    # Expired tokens are accepted: logging out after the access token expired is the normal case.
+    # An invalid bearer token gets flask_jwt_extended's usual error response.
+    tokens = []
+    scheme, _, bearer = request.headers.get(current_app.config["JWT_HEADER_NAME"], "").partition(" ")
+    if scheme == current_app.config["JWT_HEADER_TYPE"] and bearer:
+        tokens.append(decode_token(bearer, allow_expired=True))
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and data.get("refresh_token"):
+        try:
+            tokens.append(decode_token(data["refresh_token"], allow_expired=True))
+        except PyJWTError:
+            return jsonify({"message": "Invalid refresh token"}), 400
+
+    # The same token may be sent twice, as the bearer and in the body.
+    for jti, expires in {token["jti"]: token["exp"] for token in tokens}.items():
+        revocation_store().revoke(jti, expires)
+    db.session.commit()
+
+    return jsonify({"message": "Logout successful"}), 200
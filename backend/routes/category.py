@@ -1,11 +1,17 @@
 from flask import Blueprint, request, jsonify
 from models import Category
 from config import db
+from routes.formats import list_response
+from routes.versioning import bump_category_version, bump_data_version, data_etag, get_category_version, not_modified, with_etag
+from cache import category_cache, invalidate_categories_on_commit
 from datetime import datetime, UTC
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 category_blueprint = Blueprint("category", __name__)
 
+CATEGORY_FIELDS = ["id", "user_id", "Category", "createdAt"]
+CATEGORY_DICTIONARY_FIELDS = ("user_id",)
+
 @category_blueprint.route("/<user_id>/categories", methods=['GET'])
 @jwt_required()
 def get_expenses(user_id):
@@ -13,9 +19,17 @@ def get_expenses(user_id):
     if current_user != user_id:
         return jsonify({"message": "Unauthorized access"}), 403
 
-    categories = Category.query.filter_by(user_id=user_id).all()
-    json_categories = list(map(lambda x: x.to_json(), categories))
-    return jsonify({"categories": json_categories})
+    etag = data_etag(user_id, "categories")
+    if not_modified(etag):
+        return with_etag(("", 304), etag)
+
+    version = get_category_version(user_id)
+    json_categories = category_cache().get(user_id, version)
+    if json_categories is None:
+        categories = Category.query.filter_by(user_id=user_id).all()
+        json_categories = list(map(lambda x: x.to_json(), categories))
+        category_cache().set(user_id, version, json_categories)
+    return with_etag(list_response("categories", json_categories, CATEGORY_FIELDS, CATEGORY_DICTIONARY_FIELDS), etag)
 
 @category_blueprint.route("/<user_id>/categories", methods=["POST"])
 @jwt_required()
@@ -34,8 +48,12 @@ def create_category(user_id):
     )
     try:
         db.session.add(new_category)
+        bump_data_version(user_id)
+        bump_category_version(user_id)
+        invalidate_categories_on_commit(db.session, user_id)
         db.session.commit()
     except Exception as e:
+        db.session.rollback()
         return jsonify({"message": str(e)}), 400
 
     return jsonify({"message": "Category created"}), 201
@@ -54,6 +72,9 @@ def update_category(user_id, category_id):
     data = request.json
     category.category = data.get("Category", category.category)
     category.updated_at = datetime.now(tz=UTC)
+    bump_data_version(user_id)
+    bump_category_version(user_id)
+    invalidate_categories_on_commit(db.session, user_id)
     db.session.commit()
 
     return jsonify({"message": f"Category {category.id} updated"}), 200
@@ -70,6 +91,9 @@ def delete_category(user_id, category_id):
         return jsonify({"message": "Category not found"}), 404
     
     db.session.delete(category)
+    bump_data_version(user_id)
+    bump_category_version(user_id)
+    invalidate_categories_on_commit(db.session, user_id)
     db.session.commit()
 
     return jsonify({"message": f"Category {category.id} deleted"}), 200
\ No newline at end of file
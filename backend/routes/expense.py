@@ -1,21 +1,323 @@
-from flask import Blueprint, request, jsonify
-from models import Expense, Category
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from models import Expense, Category, ExpenseRollup, upsert_insert
 from config import db
+from cache import invalidate_categories_on_commit
+from routes.formats import NDJSON, list_format, list_response
+from routes.versioning import bump_category_version, bump_data_version, data_etag, not_modified, with_etag
 from datetime import datetime, UTC
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from sqlalchemy import delete, insert, select, tuple_, update
 from flask_jwt_extended import jwt_required, get_jwt_identity
+import base64
+import csv
+import io
+import json
+import uuid
 
 expense_blueprint = Blueprint("expense", __name__)
 
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 5000
+STREAM_BATCH_SIZE = 1000
+IMPORT_CHUNK_SIZE = 1000
+EXPORT_BATCH_SIZE = 10000
+EXPORT_COLUMNS = ["id", "date", "category", "amount", "description"]
+MAX_REPORTED_ERRORS = 100
+BULK_FILTER_KEYS = {"from", "to", "categoryId", "minAmount", "maxAmount"}
+# The range of Expense.amount, a Numeric(10, 2).
+MAX_AMOUNT = Decimal("99999999.99")
+EXPENSE_FIELDS = ["id", "user_id", "Date", "Category", "Amount", "Description"]
+EXPENSE_DICTIONARY_FIELDS = ("user_id", "Category")
+
+def encode_cursor(expense_date, expense_id):
+    raw = json.dumps([expense_date.isoformat(), expense_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor):
+    try:
+        expense_date, expense_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.strptime(expense_date, "%Y-%m-%d").date(), str(expense_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+def encode_search_cursor(offset):
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode()).decode()
+
+def decode_search_cursor(cursor):
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor.encode()))["offset"]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor.")
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor.")
+    return offset
+
+def parse_date_arg(args, key):
+    try:
+        return datetime.strptime(args[key], "%Y-%m-%d").date()
+    except (ValueError, TypeError):
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+def parse_amount_arg(args, key):
+    try:
+        value = Decimal(str(args[key]))
+    except InvalidOperation:
+        raise ValueError(f"Invalid value for {key}.")
+    if not value.is_finite():
+        raise ValueError(f"Invalid value for {key}.")
+    return value
+
+def parse_expense_amount(value):
+    """An expense amount rounded as the Numeric(10, 2) column stores it, or raise ValueError."""
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError("Invalid value for amount.")
+    if not amount.is_finite() or abs(amount) > MAX_AMOUNT:
+        raise ValueError(f"Invalid value for amount. Use a number between -{MAX_AMOUNT} and {MAX_AMOUNT}.")
+    # Half away from zero, like PostgreSQL, so rollup totals add what the column stores.
+    return amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+def parse_expense_filters(user_id, args):
+    filters = [Expense.user_id == user_id]
+
+    if args.get("from"):
+        filters.append(Expense.date >= parse_date_arg(args, "from"))
+    if args.get("to"):
+        filters.append(Expense.date <= parse_date_arg(args, "to"))
+    if args.get("categoryId"):
+        filters.append(Expense.category_id == str(args["categoryId"]))
+    if args.get("minAmount"):
+        filters.append(Expense.amount >= parse_amount_arg(args, "minAmount"))
+    if args.get("maxAmount"):
+        filters.append(Expense.amount <= parse_amount_arg(args, "maxAmount"))
+
+    return filters
+
+def parse_list_args(user_id, args, search):
+    """Filters, search offset and requested page size of a list query string."""
+    offset = 0
+    filters = parse_expense_filters(user_id, args)
+    cursor = args.get("cursor")
+    if cursor and search:
+        offset = decode_search_cursor(cursor)
+    elif cursor:
+        filters.append(tuple_(Expense.date, Expense.id) > decode_cursor(cursor))
+    limit = args.get("limit", type=int)
+    if limit is None and "limit" in args:
+        raise ValueError("Invalid value for limit.")
+    return filters, offset, limit
+
+def page_size(limit):
+    return min(max(MAX_PAGE_SIZE if limit is None else limit, 1), MAX_PAGE_SIZE)
+
+def paginate(rows, limit, offset, search):
+    """Trim rows fetched with limit + 1 to the page and build the cursor of the next one."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    if search:
+        return rows, encode_search_cursor(offset + limit)
+    return rows, encode_cursor(rows[-1].date, rows[-1].id)
+
+def wants_ndjson():
+    if request.args.get("stream") in ("1", "true"):
+        return True
+    return list_format(NDJSON) == NDJSON
+
+def expense_list_response(expenses, **extra):
+    return list_response("expenses", list(map(Expense.row_to_json, expenses)), EXPENSE_FIELDS, EXPENSE_DICTIONARY_FIELDS, **extra)
+
+def stream_ndjson(query):
+    """Emit one JSON document per line while rows are still being fetched."""
+    def generate():
+        rows = query.execution_options(yield_per=STREAM_BATCH_SIZE)
+        for row in rows:
+            yield current_app.json.dumps(Expense.row_to_json(row)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 @expense_blueprint.route("/<user_id>/expenses", methods=['GET'])
 @jwt_required()
 def get_expenses(user_id):
     current_user = get_jwt_identity()
     if current_user != user_id:
         return jsonify({"message": "Unauthorized access"}), 403
-    
-    expenses = Expense.query.filter_by(user_id=user_id).all()
-    json_expenses = list(map(lambda x: x.to_json(), expenses))
-    return jsonify({"expenses": json_expenses})
+
+    etag = data_etag(user_id, "expenses")
+    if not_modified(etag):
+        return with_etag(("", 304), etag)
+
+    search = request.args.get("q", "").strip()
+    cursor = request.args.get("cursor")
+    try:
+        filters, offset, limit = parse_list_args(user_id, request.args, search)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    if search:
+        query = Expense.search(Expense.list_query(*filters), search)
+    else:
+        query = Expense.list_query(*filters).order_by(Expense.date, Expense.id)
+
+    if wants_ndjson():
+        if search:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(max(limit, 1))
+        return with_etag(stream_ndjson(query), etag)
+
+    # Without a page size the whole (filtered) list is returned, as before.
+    # Search results are ranked rather than keyed by date, so they are always paged by offset.
+    if limit is None and not cursor and not search:
+        return with_etag(expense_list_response(query.all()), etag)
+
+    limit = page_size(limit)
+    expenses, next_cursor = paginate(query.offset(offset).limit(limit + 1).all(), limit, offset, search)
+    return with_etag(expense_list_response(expenses, next_cursor=next_cursor), etag)
+
+def parse_summary_filters(user_id, args):
+    filters = [ExpenseRollup.user_id == user_id]
+    try:
+        if args.get("from"):
+            filters.append(ExpenseRollup.month >= datetime.strptime(args["from"], "%Y-%m").date())
+        if args.get("to"):
+            filters.append(ExpenseRollup.month <= datetime.strptime(args["to"], "%Y-%m").date())
+    except ValueError:
+        raise ValueError("Invalid month format. Use YYYY-MM.")
+    return filters
+
+def summary_select(*filters):
+    return (
+        select(ExpenseRollup, Category.category)
+        .join(Category, ExpenseRollup.category_id == Category.id)
+        .where(*filters)
+        .order_by(ExpenseRollup.month, Category.category)
+    )
+
+@expense_blueprint.route("/<user_id>/summary", methods=['GET'])
+@jwt_required()
+def get_summary(user_id):
+    current_user = get_jwt_identity()
+    if current_user != user_id:
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    etag = data_etag(user_id, "summary")
+    if not_modified(etag):
+        return with_etag(("", 304), etag)
+
+    try:
+        filters = parse_summary_filters(user_id, request.args)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    rows = db.session.execute(summary_select(*filters)).all()
+    summary = [{**rollup.to_json(), "Category": category} for rollup, category in rows]
+    return with_etag(jsonify({"summary": summary}), etag)
+
+def export_batches(query):
+    """Read the query through a server-side cursor in lists of EXPORT_BATCH_SIZE rows."""
+    result = query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+    batch = []
+    for row in result:
+        batch.append(row)
+        if len(batch) == EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def export_csv(query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in export_batches(query):
+        for row in batch:
+            writer.writerow([row.id, row.date.isoformat(), row.category, row.amount, row.description])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+class ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the caller."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def export_parquet(query, pa, pq):
+    """Encode one Parquet row group per batch and stream each group as it is written."""
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("date", pa.date32()),
+        ("category", pa.string()),
+        ("amount", pa.decimal128(10, 2)),
+        ("description", pa.string()),
+    ])
+    cent = Decimal("0.01")
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    for batch in export_batches(query):
+        writer.write_table(pa.table({
+            "id": [row.id for row in batch],
+            "date": [row.date for row in batch],
+            "category": [row.category for row in batch],
+            "amount": [Decimal(str(row.amount)).quantize(cent) for row in batch],
+            "description": [row.description for row in batch],
+        }, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+@expense_blueprint.route("/<user_id>/export", methods=['GET'])
+@jwt_required()
+def export_expenses(user_id):
+    current_user = get_jwt_identity()
+    if current_user != user_id:
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    export_format = request.args.get("format", "csv")
+    if export_format not in ("csv", "parquet"):
+        return {"error": "Invalid format. Use csv or parquet."}, 400
+
+    try:
+        filters = parse_expense_filters(user_id, request.args)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    query = Expense.list_query(*filters).order_by(Expense.date, Expense.id)
+
+    if export_format == "csv":
+        body, mimetype = export_csv(query), "text/csv"
+    else:
+        # pyarrow is optional; only Parquet exports need it.
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            return {"error": "Parquet export is not available on this server."}, 501
+        body, mimetype = export_parquet(query, pa, pq), "application/vnd.apache.parquet"
+
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=expenses.{export_format}"
+    return response
 
 @expense_blueprint.route("/<user_id>/expenses", methods=["POST"])
 @jwt_required()
@@ -62,6 +364,11 @@ def create_expense(user_id):
     except ValueError:
         return {"error": "Invalid date format. Use YYYY-MM-DD."}, 400
 
+    try:
+        amount = parse_expense_amount(amount)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
     new_expense = Expense(
         user_id=user_id, 
         date=date, 
@@ -72,12 +379,349 @@ def create_expense(user_id):
         updated_at=updated_at)
     try:
         db.session.add(new_expense)
+        ExpenseRollup.add_expense(new_expense)
+        bump_data_version(user_id)
         db.session.commit()
     except Exception as e:
+        db.session.rollback()
         return jsonify({"message": str(e)}), 400
 
     return jsonify({"message": "Expense created"}), 201
 
+def validate_batch_item(item):
+    """Return the column values for one batch item, or raise ValueError."""
+    if not isinstance(item, dict):
+        raise ValueError("Each item must be an object")
+
+    for key, name in (("date", "a date"), ("categoryId", "a category"), ("amount", "an amount"), ("description", "a description")):
+        if not item.get(key):
+            raise ValueError(f"You must include {name}")
+
+    try:
+        expense_date = datetime.strptime(item["date"], "%Y-%m-%d").date()
+    except (ValueError, TypeError):
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+    amount = parse_expense_amount(item["amount"])
+
+    if not isinstance(item["categoryId"], str) or len(item["categoryId"]) > 100:
+        raise ValueError("Invalid value for categoryId.")
+    if not isinstance(item["description"], str) or len(item["description"]) > 255:
+        raise ValueError("Invalid value for description.")
+
+    return {
+        "date": expense_date,
+        "category_id": item["categoryId"],
+        "amount": amount,
+        "description": item["description"],
+    }
+
+def insert_expense_rows(user_id, rows):
+    """Insert validated expense dicts with one multi-row INSERT, in the current transaction."""
+    db.session.execute(insert(Expense), rows)
+    ExpenseRollup.add_expenses(rows)
+    bump_data_version(user_id)
+
+@expense_blueprint.route("/<user_id>/expenses:batch", methods=["POST"])
+@jwt_required()
+def create_expenses_batch(user_id):
+    current_user = get_jwt_identity()
+    if current_user != user_id:
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    data = request.get_json()
+    items = data.get("expenses") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({"message": "You must include a list of expenses"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"message": f"A batch may contain at most {MAX_BATCH_SIZE} expenses"}), 400
+
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, validate_batch_item(item)))
+        except ValueError as e:
+            results[index] = {"index": index, "status": 400, "error": str(e)}
+
+    category_ids = {values["category_id"] for _, values in valid}
+    owned = set()
+    if category_ids:
+        owned = set(db.session.scalars(
+            db.select(Category.id).where(Category.user_id == user_id, Category.id.in_(category_ids))
+        ))
+
+    now = datetime.now(tz=UTC)
+    rows = []
+    for index, values in valid:
+        if values["category_id"] not in owned:
+            results[index] = {"index": index, "status": 404, "error": "Category not found"}
+            continue
+        row = {**values, "id": str(uuid.uuid4()), "user_id": user_id, "created_at": now, "updated_at": now}
+        rows.append(row)
+        results[index] = {"index": index, "status": 201, "id": row["id"]}
+
+    if rows:
+        try:
+            insert_expense_rows(user_id, rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"message": str(e)}), 400
+
+    status = 201 if len(rows) == len(items) else 207 if rows else 400
+    return jsonify({
+        "message": f"{len(rows)} of {len(items)} expenses created",
+        "results": results,
+    }), status
+
+def resolve_category_names(user_id, names, category_ids):
+    """Fill category_ids (name -> id) for names, creating the missing categories in bulk."""
+    missing = {name for name in names if name not in category_ids}
+    if not missing:
+        return
+
+    now = datetime.now(tz=UTC)
+    db.session.execute(
+        upsert_insert(Category).on_conflict_do_nothing(index_elements=["user_id", "category"]),
+        [
+            {"id": str(uuid.uuid4()), "user_id": user_id, "category": name, "created_at": now, "updated_at": now}
+            for name in missing
+        ],
+    )
+    bump_category_version(user_id)
+    invalidate_categories_on_commit(db.session, user_id)
+    category_ids.update(db.session.execute(
+        db.select(Category.category, Category.id).where(Category.user_id == user_id, Category.category.in_(missing))
+    ).all())
+
+class InputStream(io.RawIOBase):
+    """Read-only file object over a WSGI input stream.
+
+    Servers that terminate the request body themselves (gunicorn) pass
+    their own reader through, which lacks the io interface TextIOWrapper
+    needs.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+def import_expenses_csv(user_id, stream, chunk_size=IMPORT_CHUNK_SIZE):
+    """Import expenses from a CSV byte stream, committing every chunk_size rows.
+
+    Yields a progress dict after each committed chunk. Only the current
+    chunk and the user's category name -> id map are kept in memory.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    progress = {"processed": 0, "imported": 0, "rejected": 0, "errors": []}
+    category_ids = {}
+
+    def reject(line, error):
+        progress["rejected"] += 1
+        if len(progress["errors"]) < MAX_REPORTED_ERRORS:
+            progress["errors"].append({"line": line, "error": error})
+
+    def flush(chunk):
+        try:
+            resolve_category_names(user_id, {values["category_id"] for _, values in chunk}, category_ids)
+            now = datetime.now(tz=UTC)
+            rows = [
+                {**values, "category_id": category_ids[values["category_id"]], "id": str(uuid.uuid4()),
+                 "user_id": user_id, "created_at": now, "updated_at": now}
+                for _, values in chunk
+            ]
+            insert_expense_rows(user_id, rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            category_ids.clear()
+            for line, _ in chunk:
+                reject(line, str(e))
+            return
+        progress["imported"] += len(rows)
+
+    try:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    except (csv.Error, UnicodeDecodeError) as e:
+        reject(1, f"Unreadable CSV: {e}")
+        yield dict(progress, done=True)
+        return
+    if not {"date", "category", "amount", "description"} <= set(reader.fieldnames):
+        reject(1, "CSV header must include date, category, amount and description")
+        yield dict(progress, done=True)
+        return
+
+    chunk = []
+    try:
+        for record in reader:
+            progress["processed"] += 1
+            item = {
+                "date": (record.get("date") or "").strip(),
+                "categoryId": (record.get("category") or "").strip(),
+                "amount": (record.get("amount") or "").strip(),
+                "description": (record.get("description") or "").strip(),
+            }
+            try:
+                chunk.append((reader.line_num, validate_batch_item(item)))
+            except ValueError as e:
+                reject(reader.line_num, str(e))
+                continue
+
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+                yield dict(progress)
+    except (csv.Error, UnicodeDecodeError) as e:
+        reject(reader.line_num, f"Unreadable CSV: {e}")
+
+    if chunk:
+        flush(chunk)
+    yield dict(progress, done=True)
+
+@expense_blueprint.route("/<user_id>/expenses:import", methods=["POST"])
+@jwt_required()
+def import_expenses(user_id):
+    current_user = get_jwt_identity()
+    if current_user != user_id:
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    # Multipart uploads are spooled to disk by werkzeug; raw text/csv bodies are read straight off the socket.
+    upload = request.files.get("file")
+    stream = upload.stream if upload else io.BufferedReader(InputStream(request.stream))
+    progress = import_expenses_csv(user_id, stream)
+
+    if wants_ndjson():
+        def generate():
+            for update in progress:
+                yield current_app.json.dumps(update) + "\n"
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    for result in progress:
+        pass
+    return jsonify(result), 200
+
+def parse_bulk_selection(user_id, data):
+    """SQL filters for the expenses selected by a bulk request's ids and/or filter."""
+    ids = data.get("ids")
+    filter_args = data.get("filter")
+    if filter_args is not None and not isinstance(filter_args, dict):
+        raise ValueError("filter must be an object")
+    unknown = set(filter_args or {}) - BULK_FILTER_KEYS
+    if unknown:
+        raise ValueError(f"Unknown filter keys: {', '.join(sorted(unknown))}. Use {', '.join(sorted(BULK_FILTER_KEYS))}.")
+
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or len(ids) > MAX_BATCH_SIZE or not all(isinstance(i, str) for i in ids):
+            raise ValueError(f"ids must be a list of 1 to {MAX_BATCH_SIZE} expense ids")
+        return parse_expense_filters(user_id, filter_args or {}) + [Expense.id.in_(ids)]
+
+    # Empty values are ignored by parse_expense_filters; a filter without any
+    # condition left would select every expense of the user.
+    filters = parse_expense_filters(user_id, filter_args or {})
+    if len(filters) > 1:
+        return filters
+
+    raise ValueError("You must include ids or a filter")
+
+@expense_blueprint.route("/<user_id>/expenses:bulkUpdate", methods=["POST"])
+@jwt_required()
+def bulk_update_expenses(user_id):
+    current_user = get_jwt_identity()
+    if current_user != user_id:
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    data = request.get_json()
+    if not isinstance(data, dict) or not isinstance(data.get("set"), dict) or not data["set"]:
+        return {"error": "You must include the fields to set"}, 400
+
+    try:
+        filters = parse_bulk_selection(user_id, data)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    changes = data["set"]
+    values = {}
+    try:
+        if "date" in changes:
+            values["date"] = parse_date_arg(changes, "date")
+        if "amount" in changes:
+            values["amount"] = parse_expense_amount(changes["amount"])
+        if "description" in changes:
+            if not isinstance(changes["description"], str) or len(changes["description"]) > 255:
+                raise ValueError("Invalid value for description.")
+            values["description"] = changes["description"]
+        if "categoryId" in changes:
+            if not isinstance(changes["categoryId"], str):
+                raise ValueError("Invalid value for categoryId.")
+            values["category_id"] = changes["categoryId"]
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    if not values:
+        return {"error": "You must include the fields to set"}, 400
+
+    if "category_id" in values:
+        category = Category.query.filter_by(id=values["category_id"], user_id=user_id).first()
+        if not category:
+            return jsonify({"error": "Category not found"}), 404
+
+    old_cells = ExpenseRollup.cells(*filters)
+    new_cells = [
+        {
+            **cell,
+            "month": values["date"].replace(day=1) if "date" in values else cell["month"],
+            "category_id": values.get("category_id", cell["category_id"]),
+            "total": values["amount"] * cell["count"] if "amount" in values else cell["total"],
+        }
+        for cell in old_cells
+    ]
+
+    result = db.session.execute(
+        update(Expense)
+        .where(*filters)
+        .values(**values, updated_at=datetime.now(tz=UTC))
+        .execution_options(synchronize_session=False)
+    )
+    ExpenseRollup.apply_deltas(ExpenseRollup.merge_deltas(
+        [{**cell, "total": -cell["total"], "count": -cell["count"]} for cell in old_cells],
+        new_cells,
+    ))
+    bump_data_version(user_id)
+    db.session.commit()
+
+    return jsonify({"message": f"{result.rowcount} expenses updated", "count": result.rowcount}), 200
+
+@expense_blueprint.route("/<user_id>/expenses:bulkDelete", methods=["POST"])
+@jwt_required()
+def bulk_delete_expenses(user_id):
+    current_user = get_jwt_identity()
+    if current_user != user_id:
+        return jsonify({"message": "Unauthorized access"}), 403
+
+    data = request.get_json()
+    try:
+        filters = parse_bulk_selection(user_id, data if isinstance(data, dict) else {})
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    old_cells = ExpenseRollup.cells(*filters)
+    result = db.session.execute(
+        delete(Expense).where(*filters).execution_options(synchronize_session=False)
+    )
+    ExpenseRollup.apply_deltas(
+        [{**cell, "total": -cell["total"], "count": -cell["count"]} for cell in old_cells]
+    )
+    bump_data_version(user_id)
+    db.session.commit()
+
+    return jsonify({"message": f"{result.rowcount} expenses deleted", "count": result.rowcount}), 200
 
 @expense_blueprint.route("/<user_id>/expenses/<expense_id>", methods=["PATCH"])
 @jwt_required()
@@ -112,6 +756,8 @@ def update_expense(user_id, expense_id):
         "description": "description",
     }
 
+    old_values = (expense.date, expense.category_id, expense.amount)
+
     for key, validator in validators.items():
         if key in data:
             try:
@@ -120,6 +766,10 @@ def update_expense(user_id, expense_id):
             except (ValueError, TypeError):
                 return {"error": f"Invalid value for {key}."}, 400
 
+    old_date, old_category_id, old_amount = old_values
+    ExpenseRollup.apply_delta(user_id, old_date, old_category_id, -old_amount, -1)
+    ExpenseRollup.add_expense(expense)
+    bump_data_version(user_id)
     db.session.commit()
 
     return jsonify({"message": f"Expense {expense.id} updated"}), 200
@@ -136,7 +786,9 @@ def delete_expense(user_id, expense_id):
     if not expense:
         return jsonify({"message": "Expense not found"}), 404
 
+    ExpenseRollup.remove_expense(expense)
     db.session.delete(expense)
+    bump_data_version(user_id)
     db.session.commit()
 
     return jsonify({"message": f"Expense {expense.id} deleted"}), 200
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Wire formats of the expense and category lists, negotiated with the Accept header.
+
+application/json (the default, also for */* and unknown types): the list
+of row objects, as before.
+
+application/vnd.columnar+json: the list as one object holding the field
+names once, one array per field and, for fields with few distinct values
+(the user id, category names), a dictionary of those values with the
+column holding indexes into it:
+
+    {"fields": ["id", "user_id", ...],
+     "columns": [["3f2c...", ...], [0, 0, ...], ...],
+     "dictionaries": {"user_id": ["8a1e..."], ...}}
+
+application/msgpack: the same document as application/json, encoded as
+MessagePack; only offered when the optional msgpack package is installed.
+
+Values are encoded as by the app's JSON provider: dates as ISO 8601
+strings, Decimals as exact strings.
+"""
+from flask import Response, current_app, request
+from json_provider import default
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+COLUMNAR = "application/vnd.columnar+json"
+MSGPACK = "application/msgpack"
+
+def list_format(*extra):
+    """Best list format for the request among JSON, extra, columnar JSON and msgpack."""
+    offered = [JSON, *extra, COLUMNAR]
+    if msgpack is not None:
+        offered.append(MSGPACK)
+    return request.accept_mimetypes.best_match(offered, default=JSON)
+
+def dictionary_encode(values):
+    """Distinct values in order of appearance and the index of each value among them."""
+    index = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return list(index), codes
+
+def to_columnar(rows, fields, dictionary_fields):
+    columns = []
+    dictionaries = {}
+    for field in fields:
+        column = [row[field] for row in rows]
+        if field in dictionary_fields:
+            dictionaries[field], column = dictionary_encode(column)
+        columns.append(column)
+    return {"fields": fields, "columns": columns, "dictionaries": dictionaries}
+
+def list_response(key, rows, fields, dictionary_fields=(), mimetype=None, **extra):
+    """Response with rows (dicts with the given fields) under key, next to extra, in the negotiated format."""
+    mimetype = mimetype or list_format()
+    if mimetype == COLUMNAR:
+        document = {key: to_columnar(rows, fields, dictionary_fields), **extra}
+        return Response(f"{current_app.json.dumps(document)}\n", mimetype=COLUMNAR)
+    if mimetype == MSGPACK:
+        return Response(msgpack.packb({key: rows, **extra}, default=default), mimetype=MSGPACK)
+    return current_app.json.response({key: rows, **extra})
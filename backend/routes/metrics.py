@@ -0,0 +1,39 @@
+from flask import Blueprint, current_app, jsonify, request
+from cache import category_cache
+from pool_metrics import pool_metrics
+from request_metrics import render
+from flask_jwt_extended import jwt_required, verify_jwt_in_request
+import hmac
+
+metrics_blueprint = Blueprint("metrics", __name__)
+prometheus_blueprint = Blueprint("prometheus", __name__)
+
+@metrics_blueprint.route("/pool", methods=["GET"])
+@jwt_required()
+def get_pool_metrics():
+    """Pool counters of the worker that served the request, per database bind."""
+    return jsonify({bind or "default": metrics.stats() for bind, metrics in pool_metrics().items()})
+
+def has_metrics_token():
+    token = current_app.config["METRICS_TOKEN"]
+    return hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+
+@metrics_blueprint.route("/cache", methods=["GET"])
+def get_cache_metrics():
+    """Category cache counters of the worker that served the request.
+
+    Requires METRICS_TOKEN when it is set, otherwise any valid access token.
+    """
+    if current_app.config["METRICS_TOKEN"]:
+        if not has_metrics_token():
+            return jsonify({"message": "Unauthorized access"}), 401
+    else:
+        verify_jwt_in_request()
+    return jsonify(category_cache().stats())
+
+@prometheus_blueprint.route("/metrics", methods=["GET"])
+def get_metrics():
+    if current_app.config["METRICS_TOKEN"] and not has_metrics_token():
+        return jsonify({"message": "Unauthorized access"}), 401
+    body, content_type = render()
+    return body, 200, {"Content-Type": content_type}
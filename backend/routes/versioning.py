@@ -0,0 +1,75 @@
+from flask import g, request, make_response
+from models import User
+from revocation import utcnow
+from config import db
+from sqlalchemy import update
+import hashlib
+
+def bump_data_version(user_id):
+    """Bump the user's data version in the current transaction.
+
+    Must run before the commit of every mutation so that a rolled back
+    change never invalidates (or validates) a cached representation. The
+    write time starts the user's read-your-writes window on the primary.
+    """
+    db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(data_version=User.data_version + 1, last_write_at=utcnow())
+    )
+    g.pop("data_versions", None)
+
+def get_data_version(user_id):
+    """Current data version of the user, read at most once per request."""
+    versions = g.setdefault("data_versions", {})
+    if user_id not in versions:
+        versions[user_id] = db.session.query(User.data_version).filter_by(id=user_id).scalar()
+    return versions[user_id]
+
+def bump_category_version(user_id):
+    """Bump the user's category version in the current transaction, like bump_data_version.
+
+    Only category writes bump it, so cached category lists survive expense writes.
+    """
+    db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(category_version=User.category_version + 1)
+    )
+    g.pop("category_versions", None)
+
+def get_category_version(user_id):
+    """Current category version of the user, read at most once per request."""
+    versions = g.setdefault("category_versions", {})
+    if user_id not in versions:
+        versions[user_id] = db.session.query(User.category_version).filter_by(id=user_id).scalar()
+    return versions[user_id]
+
+def data_etag(user_id, resource):
+    return etag_for(
+        resource,
+        user_id,
+        get_data_version(user_id),
+        request.query_string.decode(),
+        request.headers.get("Accept", ""),
+    )
+
+def etag_for(resource, user_id, version, query_string, accept):
+    """Strong ETag for a list representation of the user's data.
+
+    Query string and Accept header are part of the key since they select
+    filters, pages and wire formats of the same resource.
+    """
+    key = "|".join([resource, user_id, str(version), query_string, accept])
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+def not_modified(etag):
+    # Weak comparison, so the weak ETags of compressed responses match too.
+    return request.if_none_match.contains_weak(etag)
+
+def with_etag(response, etag):
+    response = make_response(response)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Accept")
+    return response
@@ -0,0 +1,220 @@
+"""Synthetic users, categories and expenses for `flask seed`.
+
+Rows are generated from one random.Random(seed), ids included, so a seed
+always produces the same data set. Expenses skip the ORM: PostgreSQL loads
+them with COPY, SQLite with executemany on the raw connection, committing
+every batch so a multi-million row load never holds one huge transaction.
+"""
+import csv
+import io
+import random
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import text
+
+from models import SQLITE_FTS_DDL, Category, Expense, ExpenseRollup, User
+
+# name: (relative frequency, median amount, spread of the log-normal amount, descriptions)
+CATEGORIES = {
+    "Groceries": (30, 42.0, 0.6, ["Supermarket", "Farmers market", "Bakery", "Butcher", "Corner shop", "Organic store"]),
+    "Dining": (18, 24.0, 0.5, ["Lunch", "Dinner", "Coffee", "Takeaway", "Pizza", "Sushi", "Brunch", "Breakfast"]),
+    "Transport": (14, 9.5, 0.8, ["Bus ticket", "Train ticket", "Taxi", "Fuel", "Parking", "Bike repair", "Metro pass"]),
+    "Shopping": (9, 55.0, 0.9, ["Clothes", "Shoes", "Electronics", "Books", "Homeware", "Gift", "Toys"]),
+    "Entertainment": (7, 28.0, 0.7, ["Cinema", "Concert", "Streaming subscription", "Museum", "Games", "Theatre"]),
+    "Utilities": (5, 85.0, 0.4, ["Electricity bill", "Water bill", "Internet", "Mobile phone", "Gas bill"]),
+    "Health": (4, 35.0, 0.9, ["Pharmacy", "Dentist", "Doctor", "Gym membership", "Optician"]),
+    "Travel": (3, 180.0, 1.0, ["Flight", "Hotel", "Car rental", "Travel insurance", "Souvenirs"]),
+    "Housing": (2, 950.0, 0.3, ["Rent", "Home insurance", "Repairs", "Furniture"]),
+    "Education": (2, 60.0, 0.8, ["Course fee", "Textbooks", "Stationery", "Online class"]),
+    "Personal care": (4, 22.0, 0.6, ["Haircut", "Cosmetics", "Toiletries", "Laundry"]),
+    "Pets": (2, 30.0, 0.7, ["Pet food", "Vet", "Pet supplies"]),
+}
+DETAILS = ["", "", "", " with friends", " for the weekend", " (card)", " (cash)", " - shared", " online"]
+VARIANT_DIGITS = str.maketrans("0123456789abcdef", "89ab89ab89ab89ab")
+AMOUNT_POOL_SIZE = 4096
+SQLITE_LOAD_PRAGMAS = {"synchronous": "OFF", "cache_size": -262144}
+EXPENSE_COLUMNS = ["id", "user_id", "date", "category_id", "amount", "description", "created_at", "updated_at"]
+
+
+def random_uuids(rng, count):
+    """count version 4 UUID strings, cut from one block of random bytes."""
+    digits = rng.randbytes(16 * count).hex()
+    variants = digits[16::32].translate(VARIANT_DIGITS)
+    return [
+        f"{digits[i:i + 8]}-{digits[i + 8:i + 12]}-4{digits[i + 13:i + 16]}-{variant}{digits[i + 17:i + 20]}-{digits[i + 20:i + 32]}"
+        for i, variant in zip(range(0, 32 * count, 32), variants)
+    ]
+
+
+def category_specs(count):
+    """The first count realistic categories, padded with generic ones."""
+    specs = list(CATEGORIES.items())[:count]
+    for i in range(len(specs), count):
+        specs.append((f"Other {i - len(CATEGORIES) + 1}", (1, 20.0, 1.0, ["Miscellaneous", "Fee", "Donation"])))
+    return specs
+
+
+def generate_users(rng, count, prefix, password, now):
+    return [
+        {"id": user_id, "username": f"{prefix}{i}", "password": password, "created_at": now, "updated_at": now}
+        for i, user_id in enumerate(random_uuids(rng, count))
+    ]
+
+
+def generate_categories(rng, users, count, now):
+    """Category rows and, per user, the (category id, spec) pairs their expenses draw from."""
+    rows = []
+    choices = {}
+    for user in users:
+        choices[user["id"]] = []
+        for (name, spec), category_id in zip(category_specs(count), random_uuids(rng, count)):
+            rows.append({"id": category_id, "user_id": user["id"], "category": name, "created_at": now, "updated_at": now})
+            choices[user["id"]].append((category_id, spec))
+    return rows, choices
+
+
+def generate_expenses(rng, users, choices, count, days, now):
+    """Yield expense rows in EXPENSE_COLUMNS order, as the text both loaders send.
+
+    Activity per user is Pareto distributed, so a few users own most of
+    the rows, like in production. Weekends see more spending. Amounts are
+    drawn from a pool of log-normal samples per category, which keeps the
+    distribution while costing a lookup per row.
+    """
+    user_ids = [user["id"] for user in users]
+    user_weights = [rng.paretovariate(1.2) for _ in users]
+    dates = [now.date() - timedelta(days=ago) for ago in range(days)]
+    date_weights = [1.4 if day.weekday() >= 5 else 1.0 for day in dates]
+    dates = [day.isoformat() for day in dates]
+    # Every user has the same category specs, so one draw per chunk picks category and description for all rows.
+    specs = [spec for _, spec in choices[user_ids[0]]] if user_ids else []
+    category_ids = {user_id: [category_id for category_id, _ in choices[user_id]] for user_id in user_ids}
+    descriptions = [
+        (index, text + detail) for index, spec in enumerate(specs) for text in spec[3] for detail in DETAILS
+    ]
+    description_weights = [specs[index][0] / (len(specs[index][3]) * len(DETAILS)) for index, _ in descriptions]
+    amounts = [
+        [f"{min(median * rng.lognormvariate(0, spread), 99999999.99):.2f}" for _ in range(AMOUNT_POOL_SIZE)]
+        for _, median, spread, _ in specs
+    ]
+    # The format the SQLAlchemy SQLite DateTime type stores; PostgreSQL parses it too.
+    timestamp = now.strftime("%Y-%m-%d %H:%M:%S.%f")
+    getrandbits = rng.getrandbits
+    bits = AMOUNT_POOL_SIZE.bit_length() - 1
+    for offset in range(0, count, 10000):
+        size = min(10000, count - offset)
+        for expense_id, user_id, day, (index, description) in zip(
+            random_uuids(rng, size),
+            rng.choices(user_ids, user_weights, k=size),
+            rng.choices(dates, date_weights, k=size),
+            rng.choices(descriptions, description_weights, k=size),
+        ):
+            yield (
+                expense_id, user_id, day, category_ids[user_id][index], amounts[index][getrandbits(bits)],
+                description, timestamp, timestamp,
+            )
+
+
+def batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def copy_expenses(cursor, batch):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(batch)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY expense ({', '.join(EXPENSE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def insert_sqlite_expenses(cursor, batch):
+    cursor.executemany(
+        f"INSERT INTO expense ({', '.join(EXPENSE_COLUMNS)}) VALUES ({', '.join('?' * len(EXPENSE_COLUMNS))})",
+        batch,
+    )
+
+
+def load_expenses(engine, rows, batch_size, progress=None):
+    """Bulk load expense rows on one connection, committing every batch_size rows; returns the row count.
+
+    On SQLite the load runs with synchronous=OFF and a bigger page cache
+    (both restored afterwards), each batch is sorted by id so the primary
+    key index fills in order, and the full-text insert trigger is dropped
+    for the load: the new rows are indexed in one statement at the end,
+    which is several times faster than indexing row by row.
+    """
+    loaded = 0
+    with engine.connect() as connection:
+        postgresql = connection.dialect.name == "postgresql"
+        if not postgresql:
+            first_rowid = connection.execute(text("SELECT coalesce(max(rowid), 0) FROM expense")).scalar()
+            saved = {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in SQLITE_LOAD_PRAGMAS}
+            connection.commit()
+            for name, value in SQLITE_LOAD_PRAGMAS.items():
+                connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+            connection.execute(text("DROP TRIGGER IF EXISTS expense_fts_insert"))
+            connection.commit()
+        try:
+            for batch in batches(rows, batch_size):
+                cursor = connection.connection.cursor()
+                try:
+                    if postgresql:
+                        copy_expenses(cursor, batch)
+                    else:
+                        insert_sqlite_expenses(cursor, sorted(batch))
+                finally:
+                    cursor.close()
+                connection.commit()
+                loaded += len(batch)
+                if progress:
+                    progress(loaded)
+        finally:
+            if not postgresql:
+                connection.rollback()
+                connection.execute(text(
+                    "INSERT INTO expense_fts (rowid, expense_id, description) "
+                    "SELECT rowid, id, description FROM expense WHERE rowid > :first"
+                ), {"first": first_rowid})
+                connection.execute(text(SQLITE_FTS_DDL[1]))
+                connection.commit()
+                for name, value in saved.items():
+                    connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+    return loaded
+
+
+def seed(session, users, categories, expenses, days=730, seed=0, prefix="seed-user-", password="", batch_size=100000,
+         progress=None):
+    """Generate and load a data set; returns a dict of row counts and timings."""
+    rng = random.Random(seed)
+    now = datetime.now(tz=UTC).replace(tzinfo=None, microsecond=0)
+    user_rows = generate_users(rng, users, prefix, password, now)
+    category_rows, choices = generate_categories(rng, user_rows, categories, now)
+    session.execute(User.__table__.insert(), user_rows)
+    session.execute(Category.__table__.insert(), category_rows)
+    session.commit()
+
+    started = time.perf_counter()
+    loaded = load_expenses(
+        session.get_bind(), generate_expenses(rng, user_rows, choices, expenses, days, now), batch_size, progress
+    )
+    load_seconds = time.perf_counter() - started
+
+    ExpenseRollup.rebuild()
+    session.commit()
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(text(f"ANALYZE {Expense.__tablename__}"))
+        session.commit()
+    return {
+        "users": len(user_rows),
+        "categories": len(category_rows),
+        "expenses": loaded,
+        "expense_seconds": load_seconds,
+        "total_seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,144 @@
+import unittest
+from config import TestingConfig, db
+from dotenv import load_dotenv
+from flask_jwt_extended import create_access_token
+from models import Category, User
+from unittest import mock
+import gzip
+import importlib.util
+import json
+import tempfile
+import uuid
+
+ASYNC_DEPENDENCIES = ("starlette", "a2wsgi", "aiosqlite", "httpx")
+
+@unittest.skipUnless(
+    all(importlib.util.find_spec(name) for name in ASYNC_DEPENDENCIES),
+    "the async serving dependencies are not installed",
+)
+class AsgiTestCase(unittest.TestCase):
+    def setUp(self):
+        from asgi import create_asgi_app
+        from starlette.testclient import TestClient
+
+        load_dotenv('.flaskenv')
+        # The async engine opens its own connections, so both apps need a database file.
+        self.directory = tempfile.TemporaryDirectory()
+        with mock.patch.object(TestingConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{self.directory.name}/test.db"):
+            self.asgi_app = create_asgi_app('testing')
+        self.api = self.asgi_app.state.api
+        self.app = self.api.flask_app
+        self.app.config["TESTING"] = True
+        self.app.config['JWT_SECRET_KEY'] = uuid.uuid4().hex
+        self.client = self.app.test_client()
+        self.async_client = TestClient(self.asgi_app).__enter__()
+
+        self.fallbacks = 0
+        wsgi = self.api.wsgi
+
+        async def counting_wsgi(scope, receive, send):
+            self.fallbacks += 1
+            await wsgi(scope, receive, send)
+
+        self.api.wsgi = counting_wsgi
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username="test_user", password="test_password")
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=self.user_id)}"}
+
+        categories_url = f"/api/category/{self.user_id}/categories"
+        for name in ("Dining", "Travel"):
+            self.client.post(categories_url, json={"Category": name}, headers=self.headers)
+        with self.app.app_context():
+            category_ids = [category.id for category in Category.query.order_by(Category.category)]
+        for day in range(1, 6):
+            self.client.post(
+                f"/api/expense/{self.user_id}/expenses",
+                json={
+                    "date": f"2025-0{day}-1{day}",
+                    "categoryId": category_ids[day % 2],
+                    "amount": f"{day}.50",
+                    "description": f"Expense {day}",
+                },
+                headers=self.headers,
+            )
+
+    def tearDown(self):
+        self.async_client.__exit__(None, None, None)
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+        self.directory.cleanup()
+
+    def assert_same_response(self, url, headers):
+        # The test clients default these differently; the ETag depends on both.
+        headers = {"Accept": "*/*", "Accept-Encoding": "identity", **headers}
+        expected = self.client.get(url, headers=headers)
+        response = self.async_client.get(url, headers=headers)
+        self.assertEqual(response.status_code, expected.status_code, url)
+        self.assertEqual(response.content, expected.data, url)
+        for header in ("Content-Type", "ETag", "Cache-Control", "Vary", "Access-Control-Allow-Origin"):
+            self.assertEqual(response.headers.get_list(header), expected.headers.getlist(header), f"{url} {header}")
+        return response
+
+    def test_reads_match_wsgi_app(self):
+        headers = {**self.headers, "Origin": "http://localhost:5173"}
+        urls = [
+            f"/api/expense/{self.user_id}/expenses",
+            f"/api/expense/{self.user_id}/expenses?from=2025-02-01&to=2025-04-30",
+            f"/api/expense/{self.user_id}/summary",
+            f"/api/expense/{self.user_id}/summary?from=2025-03",
+            f"/api/category/{self.user_id}/categories",
+        ]
+        for url in urls:
+            self.assert_same_response(url, headers)
+
+        url = f"/api/expense/{self.user_id}/expenses?limit=2"
+        response = self.assert_same_response(url, headers)
+        next_cursor = response.json()["next_cursor"]
+        self.assert_same_response(f"{url}&cursor={next_cursor}", headers)
+
+        for accept in ("application/vnd.columnar+json", "application/msgpack"):
+            for url in (urls[0], urls[-1], f"{urls[0]}?limit=2"):
+                self.assert_same_response(url, {**headers, "Accept": accept})
+
+        response = self.assert_same_response(urls[0], headers)
+        self.assert_same_response(urls[0], {**headers, "If-None-Match": response.headers["ETag"]})
+        self.assertEqual(self.fallbacks, 0)
+
+    def test_other_requests_use_wsgi_app(self):
+        with self.app.app_context():
+            other_headers = {"Authorization": f"Bearer {create_access_token(identity=str(uuid.uuid4()))}"}
+        requests = [
+            (f"/api/expense/{self.user_id}/expenses", {}),
+            (f"/api/expense/{self.user_id}/expenses", other_headers),
+            (f"/api/expense/{self.user_id}/expenses?q=expense", self.headers),
+            (f"/api/expense/{self.user_id}/expenses?limit=abc", self.headers),
+            (f"/api/expense/{self.user_id}/expenses", {**self.headers, "Accept": "application/x-ndjson"}),
+            (f"/api/expense/{self.user_id}/summary?from=2025", self.headers),
+        ]
+        for url, headers in requests:
+            self.assert_same_response(url, headers)
+        self.assertEqual(self.fallbacks, len(requests))
+
+        response = self.async_client.post(
+            f"/api/category/{self.user_id}/categories", json={"Category": "Rent"}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.async_client.get(f"/api/category/{self.user_id}/categories", headers=self.headers)
+        self.assertEqual(len(response.json()["categories"]), 3)
+
+    def test_reads_are_compressed(self):
+        url = f"/api/expense/{self.user_id}/expenses"
+        headers = {**self.headers, "Accept": "*/*", "Accept-Encoding": "gzip"}
+        with mock.patch.dict(self.app.config, COMPRESSION_MIN_SIZE=0):
+            expected = self.client.get(url, headers=headers)
+            response = self.async_client.get(url, headers=headers)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.headers["ETag"], expected.headers["ETag"])
+        self.assertEqual(response.json(), json.loads(gzip.decompress(expected.data)))
+        self.assertEqual(self.fallbacks, 0)
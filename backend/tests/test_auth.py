@@ -2,8 +2,13 @@ import unittest
 from flask import json
 from config import create_app, db
 from dotenv import load_dotenv
-from models import User
-from werkzeug.security import generate_password_hash
+from models import RevokedToken, User
+from werkzeug.security import generate_password_hash, check_password_hash
+from hashing import PasswordHasher
+from revocation import BloomFilter
+from datetime import timedelta
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from sqlalchemy import event
 import os
 import uuid
 
@@ -134,4 +139,153 @@ class AuthTestCase(unittest.TestCase):
         self.assertEqual(refresh_response.status_code, 200)
         self.assertNotEqual(login_response.json["access_token"], refresh_response.json["access_token"])
         self.assertIn("access_token", refresh_response.json)
-        self.assertIn("Token refresh successful", refresh_response.json["message"])
\ No newline at end of file
+        self.assertIn("Token refresh successful", refresh_response.json["message"])
+
+    def test_login_rehashes_outdated_password(self):
+        """Test that login upgrades hashes made with other parameters."""
+        with self.app.app_context():
+            user = User(username="testuser", password=generate_password_hash("testpassword", method="pbkdf2:sha256:1000"))
+            db.session.add(user)
+            db.session.commit()
+
+        payload = {
+            "username": "testuser",
+            "password": "testpassword"
+        }
+        response = self.client.post(
+            "api/auth/login", data=json.dumps(payload), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        with self.app.app_context():
+            user = User.query.filter_by(username="testuser").first()
+            self.assertTrue(user.password.startswith(self.app.config["PASSWORD_HASH_METHOD"] + "$"))
+            self.assertTrue(check_password_hash(user.password, "testpassword"))
+
+    def test_login_busy(self):
+        """Test that logins are shed when the hashing queue is full."""
+        with self.app.app_context():
+            user = User(username="testuser", password=generate_password_hash("testpassword"))
+            db.session.add(user)
+            db.session.commit()
+
+        hasher = self.app.extensions["password_hasher"]
+        while hasher.slots.acquire(blocking=False):
+            pass
+
+        payload = {
+            "username": "testuser",
+            "password": "testpassword"
+        }
+        response = self.client.post(
+            "api/auth/login", data=json.dumps(payload), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+    def test_hasher_process_pool(self):
+        """Test hashing and verification on a worker process."""
+        hasher = PasswordHasher("scrypt:16384:8:1", workers=2, max_pending=4)
+        try:
+            stored = hasher.hash("secret")
+            # Not forked from this (threaded) process, and started on demand rather than all at once.
+            self.assertNotEqual(hasher.pool._mp_context.get_start_method(), "fork")
+            self.assertEqual(len(hasher.pool._processes), 1)
+            self.assertTrue(hasher.verify(stored, "secret"))
+            self.assertFalse(hasher.verify(stored, "wrong"))
+            self.assertFalse(hasher.needs_rehash(stored))
+        finally:
+            hasher.shutdown()
+
+    def test_logout_revokes_tokens(self):
+        """Test that logout revokes the bearer token and the refresh token."""
+        with self.app.app_context():
+            user = User(username="testuser", password=generate_password_hash("testpassword"))
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+
+        payload = {
+            "username": "testuser",
+            "password": "testpassword"
+        }
+        login_response = self.client.post(
+            "api/auth/login", data=json.dumps(payload), content_type="application/json"
+        )
+        access_headers = {"Authorization": f"Bearer {login_response.json['access_token']}"}
+        refresh_headers = {"Authorization": f"Bearer {login_response.json['refresh_token']}"}
+
+        response = self.client.get(f"api/category/{user_id}/categories", headers=access_headers)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(
+            "api/auth/logout",
+            data=json.dumps({"refresh_token": login_response.json["refresh_token"]}),
+            content_type="application/json",
+            headers=access_headers,
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(f"api/category/{user_id}/categories", headers=access_headers)
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post("api/auth/refresh", headers=refresh_headers)
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_repeated_and_expired_tokens(self):
+        """Test that logout tolerates repeated, duplicated and expired tokens and odd bodies."""
+        with self.app.app_context():
+            user = User(username="testuser", password=generate_password_hash("testpassword"))
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+            refresh_token = create_refresh_token(identity=user_id)
+            expired_token = create_access_token(identity=user_id, expires_delta=timedelta(seconds=-1))
+
+        for _ in range(2):
+            response = self.client.post(
+                "api/auth/logout",
+                data=json.dumps({"refresh_token": refresh_token}),
+                content_type="application/json",
+                headers={"Authorization": f"Bearer {refresh_token}"},
+            )
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.post("api/auth/logout", headers={"Authorization": f"Bearer {expired_token}"})
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            self.assertEqual(RevokedToken.query.count(), 2)
+            expired_jti = decode_token(expired_token, allow_expired=True)["jti"]
+            self.assertIsNotNone(RevokedToken.query.filter_by(jti=expired_jti).first())
+
+        response = self.client.post("api/auth/logout", data="[1]", content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post("api/auth/logout", headers={"Authorization": "Bearer not-a-token"})
+        self.assertEqual(response.status_code, 422)
+
+    def test_valid_token_check_skips_database(self):
+        """Test that checking a non-revoked token runs no SQL."""
+        store = self.app.extensions["revocation_store"]
+        with self.app.app_context():
+            store.is_revoked(str(uuid.uuid4()))
+
+            statements = []
+            def count(*args):
+                statements.append(args)
+            event.listen(db.engine, "before_cursor_execute", count)
+            try:
+                for _ in range(100):
+                    self.assertFalse(store.is_revoked(str(uuid.uuid4())))
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count)
+
+        self.assertLessEqual(len(statements), 1)
+
+    def test_bloom_filter(self):
+        """Test that the Bloom filter has no false negatives."""
+        bloom = BloomFilter(1000, 0.01)
+        keys = [str(uuid.uuid4()) for _ in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(1000))
+        self.assertLess(false_positives, 50)
@@ -6,6 +6,7 @@ from dotenv import load_dotenv
 from datetime import datetime, UTC
 from flask_jwt_extended import create_access_token
 import uuid
+from cache import VersionedLRUCache
 
 class CategoryTestCase(unittest.TestCase):
     def setUp(self):
@@ -47,6 +48,109 @@ class CategoryTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("categories", response.json)
 
+    def test_get_categories_etag(self):
+        url = f"api/category/{self.user_id}/categories"
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+
+        response = self.client.get(url, headers={**self.headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.client.post(url, data=json.dumps({"Category": "Dining"}), headers=self.headers)
+        response = self.client.get(url, headers={**self.headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json["categories"]), 1)
+
+    def test_get_categories_columnar(self):
+        url = f"api/category/{self.user_id}/categories"
+        for name in ("Dining", "Travel"):
+            self.client.post(url, data=json.dumps({"Category": name}), headers=self.headers)
+        expected = self.client.get(url, headers=self.headers).json["categories"]
+
+        response = self.client.get(url, headers={**self.headers, "Accept": "application/vnd.columnar+json"})
+        self.assertEqual(response.mimetype, "application/vnd.columnar+json")
+        columnar = response.json["categories"]
+        self.assertEqual(columnar["fields"], ["id", "user_id", "Category", "createdAt"])
+        self.assertEqual(columnar["dictionaries"], {"user_id": [self.user_id]})
+        self.assertEqual(columnar["columns"][2], [category["Category"] for category in expected])
+        self.assertEqual(columnar["columns"][0], [category["id"] for category in expected])
+
+    def test_failed_create_keeps_etag(self):
+        url = f"api/category/{self.user_id}/categories"
+        self.client.post(url, data=json.dumps({"Category": "Dining"}), headers=self.headers)
+        etag = self.client.get(url, headers=self.headers).headers["ETag"]
+
+        response = self.client.post(url, data=json.dumps({"Category": "Dining"}), headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(url, headers={**self.headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_get_categories_cached(self):
+        url = f"api/category/{self.user_id}/categories"
+        self.client.post(url, data=json.dumps({"Category": "Dining"}), headers=self.headers)
+
+        self.client.get(url, headers=self.headers)
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual([c["Category"] for c in response.json["categories"]], ["Dining"])
+
+        stats = self.client.get("api/metrics/cache", headers=self.headers).json
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+        self.client.post(url, data=json.dumps({"Category": "Travel"}), headers=self.headers)
+        self.assertEqual(self.client.get("api/metrics/cache", headers=self.headers).json["invalidations"], 1)
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(len(response.json["categories"]), 2)
+
+    def test_cache_survives_expense_writes(self):
+        url = f"api/category/{self.user_id}/categories"
+        self.client.post(url, data=json.dumps({"Category": "Dining"}), headers=self.headers)
+        category_id = self.client.get(url, headers=self.headers).json["categories"][0]["id"]
+
+        response = self.client.post(
+            f"api/expense/{self.user_id}/expenses",
+            data=json.dumps({"date": "2025-05-14", "categoryId": category_id, "amount": 12, "description": "Lunch"}),
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 201)
+        self.client.get(url, headers=self.headers)
+        stats = self.app.extensions["category_cache"].stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+        # Another worker's cache, which saw no invalidation, still misses after a category write.
+        with self.app.app_context():
+            version = db.session.get(User, self.user_id).category_version
+        self.client.patch(f"{url}/{category_id}", data=json.dumps({"Category": "Food"}), headers=self.headers)
+        with self.app.app_context():
+            self.assertEqual(db.session.get(User, self.user_id).category_version, version + 1)
+
+    def test_cache_not_invalidated_on_rollback(self):
+        url = f"api/category/{self.user_id}/categories"
+        self.client.post(url, data=json.dumps({"Category": "Dining"}), headers=self.headers)
+        self.client.get(url, headers=self.headers)
+
+        response = self.client.post(url, data=json.dumps({"Category": "Dining"}), headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        stats = self.client.get("api/metrics/cache", headers=self.headers).json
+        self.assertEqual((stats["size"], stats["invalidations"]), (1, 0))
+        self.client.get(url, headers=self.headers)
+        self.assertEqual(self.client.get("api/metrics/cache", headers=self.headers).json["hits"], 1)
+
+    def test_lru_cache_eviction(self):
+        cache = VersionedLRUCache(2)
+        cache.set("a", 1, ["a"])
+        cache.set("b", 1, ["b"])
+        self.assertEqual(cache.get("a", 1), ["a"])
+        cache.set("c", 1, ["c"])
+
+        self.assertIsNone(cache.get("b", 1))
+        self.assertIsNone(cache.get("a", 2))
+        self.assertEqual(cache.get("c", 1), ["c"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["size"], 2)
+
     def test_create_category(self):
         payload = {
             "Category": "Dining"
@@ -0,0 +1,116 @@
+import unittest
+from config import TestingConfig, create_app, db
+from models import Category, Expense, User
+from datetime import date
+from dotenv import load_dotenv
+from flask_jwt_extended import create_access_token
+from unittest import mock
+import compression
+import gzip
+import importlib.util
+import json
+import uuid
+import zlib
+
+class CompressionTestCase(unittest.TestCase):
+    def setUp(self):
+        load_dotenv('.flaskenv')
+        self.app = self.create_app()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username="test_user", password="test_password")
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+            category = Category(category="Dining", user_id=self.user_id)
+            db.session.add(category)
+            db.session.commit()
+            for day in range(1, 29):
+                db.session.add(Expense(
+                    user_id=self.user_id, date=date(2025, 2, day), category_id=category.id, amount=day,
+                    description=f"Lunch with friends {day}",
+                ))
+            db.session.commit()
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=self.user_id)}"}
+        self.url = f"/api/expense/{self.user_id}/expenses"
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def create_app(self, **settings):
+        with mock.patch.multiple(TestingConfig, **{"RESPONSE_COMPRESSION": True, **settings}):
+            app = create_app('testing')
+        app.config["TESTING"] = True
+        app.config['JWT_SECRET_KEY'] = uuid.uuid4().hex
+        self.client = app.test_client()
+        return app
+
+    def get(self, url, **headers):
+        return self.client.get(url, headers={**self.headers, **headers})
+
+    def test_gzip_json(self):
+        identity = self.get(self.url, **{"Accept-Encoding": "identity"})
+        self.assertNotIn("Content-Encoding", identity.headers)
+        self.assertIn("Accept-Encoding", identity.vary)
+
+        response = self.get(self.url, **{"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.vary)
+        self.assertEqual(gzip.decompress(response.data), identity.data)
+        self.assertLess(len(response.data), len(identity.data))
+        self.assertEqual(int(response.headers["Content-Length"]), len(response.data))
+
+        etag, weak = response.get_etag()
+        self.assertTrue(weak)
+        self.assertEqual(etag, identity.get_etag()[0])
+        for encoding in ("gzip", "identity"):
+            revalidated = self.get(self.url, **{"Accept-Encoding": encoding, "If-None-Match": response.headers["ETag"]})
+            self.assertEqual(revalidated.status_code, 304, encoding)
+
+    @unittest.skipUnless(importlib.util.find_spec("brotli"), "brotli is not installed")
+    def test_brotli_preferred(self):
+        import brotli
+
+        response = self.get(self.url, **{"Accept-Encoding": "gzip, deflate, br"})
+        self.assertEqual(response.headers["Content-Encoding"], "br")
+        self.assertEqual(json.loads(brotli.decompress(response.data)), self.get(self.url).json)
+
+        response = self.get(self.url, **{"Accept-Encoding": "br;q=0.5, gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+
+    def test_small_and_other_responses_are_not_compressed(self):
+        response = self.get(f"/api/category/{self.user_id}/categories", **{"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertIn("Accept-Encoding", response.vary)
+
+        response = self.client.post(
+            "/api/auth/login", json={"username": "test_user", "password": "wrong"}, headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    def test_stream_compressed_incrementally(self):
+        identity = self.get(self.url, Accept="application/x-ndjson", **{"Accept-Encoding": "identity"})
+        with mock.patch.object(compression, "STREAM_FLUSH_BYTES", 256):
+            response = self.get(self.url, Accept="application/x-ndjson", **{"Accept-Encoding": "gzip"})
+            self.assertTrue(response.is_streamed)
+            self.assertNotIn("Content-Length", response.headers)
+            chunks = list(response.response)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertGreater(len(chunks), 2)
+
+        # Every flushed chunk decodes to whole lines without waiting for the rest.
+        decompressor = zlib.decompressobj(31)
+        first = decompressor.decompress(chunks[0])
+        self.assertTrue(first.endswith(b"\n"))
+        self.assertEqual(first + b"".join(map(decompressor.decompress, chunks[1:])), identity.data)
+
+    def test_disabled(self):
+        self.app = self.create_app(RESPONSE_COMPRESSION=False, COMPRESSION_MIN_SIZE=0)
+        with self.app.app_context():
+            db.create_all()
+        response = self.get(self.url, **{"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertNotIn("Accept-Encoding", response.vary)
@@ -1,11 +1,18 @@
 import unittest
 from flask import json
-from config import create_app, db
-from models import Expense, Category, User
+from config import TestingConfig, create_app, db
+from models import Expense, Category, ExpenseRollup, User
 from datetime import date, datetime, UTC
+from decimal import Decimal
 from dotenv import load_dotenv
 import uuid
 from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from routes.expense import import_expenses_csv
+import csv
+import io
+import importlib.util
+from unittest import mock
 
 class ExpenseTestCase(unittest.TestCase):
     def setUp(self):
@@ -74,6 +81,335 @@ class ExpenseTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("expenses", response.json)
 
+    def test_get_expenses_paginated(self):
+        with self.app.app_context():
+            category = Category(
+                category="Restaurants",
+                user_id=self.user_id
+            )
+            db.session.add(category)
+            db.session.commit()
+            category_id = category.id
+
+            for day in range(1, 6):
+                db.session.add(Expense(user_id=self.user_id, date=date(2025, 1, day), category_id=category_id, amount=day, description=f"Meal {day}"))
+            db.session.commit()
+
+        descriptions = []
+        cursor = None
+        for _ in range(3):
+            url = f"/api/expense/{self.user_id}/expenses?limit=2"
+            if cursor:
+                url += f"&cursor={cursor}"
+            response = self.client.get(url, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            descriptions += [e["Description"] for e in response.json["expenses"]]
+            cursor = response.json["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertIsNone(cursor)
+        self.assertEqual(descriptions, [f"Meal {day}" for day in range(1, 6)])
+
+    def test_get_expenses_filtered(self):
+        with self.app.app_context():
+            dining = Category(category="Dining", user_id=self.user_id)
+            travel = Category(category="Travel", user_id=self.user_id)
+            db.session.add_all([dining, travel])
+            db.session.commit()
+            dining_id = dining.id
+
+            db.session.add(Expense(user_id=self.user_id, date=date(2025, 1, 5), category_id=dining.id, amount=10, description="Lunch"))
+            db.session.add(Expense(user_id=self.user_id, date=date(2025, 2, 5), category_id=dining.id, amount=50, description="Dinner"))
+            db.session.add(Expense(user_id=self.user_id, date=date(2025, 2, 6), category_id=travel.id, amount=200, description="Train"))
+            db.session.commit()
+
+        response = self.client.get(
+            f"/api/expense/{self.user_id}/expenses?from=2025-02-01&to=2025-02-28&categoryId={dining_id}&minAmount=20&maxAmount=100",
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e["Description"] for e in response.json["expenses"]], ["Dinner"])
+
+    def test_get_expenses_invalid_filters(self):
+        for query in ("from=bad-date", "minAmount=abc", "cursor=not-a-cursor", "limit=abc"):
+            response = self.client.get(
+                f"/api/expense/{self.user_id}/expenses?{query}",
+                headers=self.headers
+            )
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn("error", response.json)
+
+    def test_get_expenses_matches_to_json(self):
+        with self.app.app_context():
+            category = Category(category="Restaurants", user_id=self.user_id)
+            db.session.add(category)
+            db.session.commit()
+
+            db.session.add(Expense(user_id=self.user_id, date=date(2022, 3, 24), category_id=category.id, amount=15.3, description="Breakfast"))
+            db.session.add(Expense(user_id=self.user_id, date=date(2025, 1, 12), category_id=category.id, amount=60.54, description="Dinner"))
+            db.session.commit()
+
+            expenses = Expense.query.filter_by(user_id=self.user_id).order_by(Expense.date, Expense.id).all()
+            expected = self.app.json.response({"expenses": [e.to_json() for e in expenses]}).get_data()
+
+        response = self.client.get(
+            f"/api/expense/{self.user_id}/expenses",
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(), expected)
+
+    def test_get_expenses_ndjson_stream(self):
+        with self.app.app_context():
+            category = Category(category="Restaurants", user_id=self.user_id)
+            db.session.add(category)
+            db.session.commit()
+
+            for day in range(1, 4):
+                db.session.add(Expense(user_id=self.user_id, date=date(2025, 1, day), category_id=category.id, amount=day, description=f"Meal {day}"))
+            db.session.commit()
+
+        for url, headers in (
+            (f"/api/expense/{self.user_id}/expenses?stream=1", self.headers),
+            (f"/api/expense/{self.user_id}/expenses", {**self.headers, "Accept": "application/x-ndjson"}),
+        ):
+            response = self.client.get(url, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, "application/x-ndjson")
+            self.assertTrue(response.is_streamed)
+
+            lines = response.get_data(as_text=True).splitlines()
+            self.assertEqual([json.loads(line)["Description"] for line in lines], ["Meal 1", "Meal 2", "Meal 3"])
+            self.assertEqual(json.loads(lines[0])["Category"], "Restaurants")
+
+    def test_get_expenses_columnar_and_msgpack(self):
+        with self.app.app_context():
+            categories = [Category(category=name, user_id=self.user_id) for name in ("Restaurants", "Travel")]
+            db.session.add_all(categories)
+            db.session.commit()
+            for day in range(1, 6):
+                db.session.add(Expense(user_id=self.user_id, date=date(2025, 1, day), category_id=categories[day % 2].id, amount=day + 0.25, description=f"Meal {day}"))
+            db.session.commit()
+
+        url = f"/api/expense/{self.user_id}/expenses"
+        expected = self.client.get(url, headers=self.headers)
+        for accept in ("*/*", "text/html", "application/json, application/msgpack;q=0.5"):
+            response = self.client.get(url, headers={**self.headers, "Accept": accept})
+            self.assertEqual((response.mimetype, response.get_data()), ("application/json", expected.get_data()), accept)
+
+        response = self.client.get(url, headers={**self.headers, "Accept": "application/vnd.columnar+json"})
+        self.assertEqual(response.mimetype, "application/vnd.columnar+json")
+        self.assertNotEqual(response.headers["ETag"], expected.headers["ETag"])
+        columnar = response.json["expenses"]
+        self.assertEqual(columnar["fields"], ["id", "user_id", "Date", "Category", "Amount", "Description"])
+        self.assertEqual(columnar["dictionaries"], {"user_id": [self.user_id], "Category": ["Travel", "Restaurants"]})
+        self.assertEqual(columnar["columns"][1], [0] * 5)
+        self.assertEqual(columnar["columns"][3], [0, 1, 0, 1, 0])
+        dictionaries = columnar["dictionaries"]
+        rows = [
+            {field: dictionaries[field][value] if field in dictionaries else value for field, value in zip(columnar["fields"], values)}
+            for values in zip(*columnar["columns"])
+        ]
+        self.assertEqual(rows, expected.json["expenses"])
+
+        response = self.client.get(f"{url}?limit=2", headers={**self.headers, "Accept": "application/vnd.columnar+json"})
+        self.assertEqual(len(response.json["expenses"]["columns"][0]), 2)
+        self.assertIsNotNone(response.json["next_cursor"])
+
+        if importlib.util.find_spec("msgpack"):
+            import msgpack
+
+            response = self.client.get(url, headers={**self.headers, "Accept": "application/msgpack"})
+            self.assertEqual(response.mimetype, "application/msgpack")
+            self.assertEqual(msgpack.unpackb(response.get_data()), expected.json)
+
+    def count_list_queries(self, expense_count):
+        with self.app.app_context():
+            for i in range(expense_count):
+                category = Category(category=f"Category {expense_count}-{i}", user_id=self.user_id)
+                db.session.add(category)
+                db.session.flush()
+                db.session.add(Expense(user_id=self.user_id, date=date(2025, 1, 1), category_id=category.id, amount=i + 1, description="Item"))
+            db.session.commit()
+
+            statements = []
+            def count(*args):
+                statements.append(args)
+            event.listen(db.engine, "before_cursor_execute", count)
+            try:
+                response = self.client.get(
+                    f"/api/expense/{self.user_id}/expenses",
+                    headers=self.headers
+                )
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count)
+
+        self.assertEqual(response.status_code, 200)
+        return len(statements)
+
+    def test_get_expenses_query_count_is_constant(self):
+        # The first request of a worker loads the token revocation filter.
+        self.client.get(f"/api/expense/{self.user_id}/expenses", headers=self.headers)
+        small = self.count_list_queries(2)
+        large = self.count_list_queries(50)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 2)
+
+    def test_get_expenses_etag(self):
+        with self.app.app_context():
+            category = Category(category="Restaurants", user_id=self.user_id)
+            db.session.add(category)
+            db.session.commit()
+            category_id = category.id
+
+        url = f"/api/expense/{self.user_id}/expenses"
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+
+        with self.app.app_context():
+            statements = []
+            def count(*args):
+                statements.append(args)
+            event.listen(db.engine, "before_cursor_execute", count)
+            try:
+                response = self.client.get(url, headers={**self.headers, "If-None-Match": etag})
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(statements), 1)
+
+        payload = {
+            "date": "2025-05-14",
+            "categoryId": category_id,
+            "amount": 20.5,
+            "description": "Lunch",
+        }
+        self.client.post(url, data=json.dumps(payload), headers=self.headers)
+
+        response = self.client.get(url, headers={**self.headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(len(response.json["expenses"]), 1)
+
+    def test_summary_tracks_mutations(self):
+        with self.app.app_context():
+            dining = Category(category="Dining", user_id=self.user_id)
+            travel = Category(category="Travel", user_id=self.user_id)
+            db.session.add_all([dining, travel])
+            db.session.commit()
+            dining_id, travel_id = dining.id, travel.id
+
+        url = f"/api/expense/{self.user_id}/expenses"
+        for amount in (10.25, 4.5):
+            payload = {"date": "2025-01-05", "categoryId": dining_id, "amount": amount, "description": "Lunch"}
+            self.client.post(url, data=json.dumps(payload), headers=self.headers)
+
+        with self.app.app_context():
+            expense_id = Expense.query.filter_by(amount=4.5).first().id
+
+        payload = {"date": "2025-02-01", "categoryId": travel_id, "amount": 30}
+        response = self.client.patch(f"{url}/{expense_id}", data=json.dumps(payload), headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(f"/api/expense/{self.user_id}/summary", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(s["Month"], s["Category"], s["Total"], s["Count"]) for s in response.json["summary"]],
+            [("2025-01", "Dining", 10.25, 1), ("2025-02", "Travel", 30.0, 1)],
+        )
+
+        response = self.client.delete(f"{url}/{expense_id}", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(f"/api/expense/{self.user_id}/summary?from=2025-02", headers=self.headers)
+        self.assertEqual(response.json["summary"], [])
+
+        with self.app.app_context():
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+
+    def test_rollup_rebuild(self):
+        with self.app.app_context():
+            category = Category(category="Dining", user_id=self.user_id)
+            db.session.add(category)
+            db.session.commit()
+            db.session.add(Expense(user_id=self.user_id, date=date(2025, 3, 2), category_id=category.id, amount=12, description="Lunch"))
+            db.session.add(Expense(user_id=self.user_id, date=date(2025, 3, 9), category_id=category.id, amount=8, description="Lunch"))
+            db.session.commit()
+            self.assertEqual(len(ExpenseRollup.mismatches()), 1)
+
+        result = self.app.test_cli_runner().invoke(args=["rollup", "rebuild"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Rollup verified", result.output)
+
+        with self.app.app_context():
+            rollup = ExpenseRollup.query.one()
+            self.assertEqual((rollup.month, float(rollup.total), rollup.count), (date(2025, 3, 1), 20.0, 2))
+
+    def test_seed_command(self):
+        args = ["seed", "--users", "3", "--categories", "14", "--expenses", "500", "--batch-size", "200"]
+        result = self.app.test_cli_runner().invoke(args=args)
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Seeded 3 users, 42 categories and 500 expenses", result.output)
+
+        with self.app.app_context():
+            seeded_user = User.query.filter_by(username="seed-user-0").one()
+            self.assertEqual(Expense.query.count(), 500)
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+            self.assertIn("Other 2", {c.category for c in Category.query.filter_by(user_id=seeded_user.id)})
+            expense = Expense.query.first()
+            seeded_user_id, token = seeded_user.id, create_access_token(identity=seeded_user.id)
+
+        # Seeded rows are searchable, and the search index trigger is back for new ones.
+        headers = {"Authorization": f"Bearer {token}"}
+        url = f"/api/expense/{seeded_user_id}/expenses"
+        self.assertTrue(self.client.get(f"{url}?q={expense.description.split()[0]}", headers=headers).json["expenses"])
+        self.client.post(url, json={
+            "date": "2025-01-01", "categoryId": expense.category_id, "amount": "1", "description": "Zeppelin ride",
+        }, headers=headers)
+        self.assertEqual(len(self.client.get(f"{url}?q=zeppelin", headers=headers).json["expenses"]), 1)
+
+        # The same seed produces the same rows, so it cannot be loaded twice.
+        result = self.app.test_cli_runner().invoke(args=args)
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("already exist", result.output)
+
+    def test_search_expenses(self):
+        with self.app.app_context():
+            category = Category(category="Travel", user_id=self.user_id)
+            db.session.add(category)
+            db.session.commit()
+            for i, description in enumerate(["Uber to airport", "Dentist", "Uber eats uber", "Train", "Ubering home"]):
+                db.session.add(Expense(user_id=self.user_id, date=date(2025, 1, i + 1), category_id=category.id, amount=10, description=description))
+            db.session.commit()
+            dentist = Expense.query.filter_by(description="Dentist").first()
+            dentist.description = "Uber tip"
+            db.session.delete(Expense.query.filter_by(description="Train").first())
+            db.session.commit()
+
+        url = f"/api/expense/{self.user_id}/expenses?q=uber&limit=2"
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        first_page = [e["Description"] for e in response.json["expenses"]]
+        self.assertEqual(first_page[0], "Uber eats uber")
+        self.assertIsNotNone(response.json["next_cursor"])
+
+        next_cursor = response.json["next_cursor"]
+        response = self.client.get(f"{url}&cursor={next_cursor}", headers=self.headers)
+        second_page = [e["Description"] for e in response.json["expenses"]]
+        self.assertIsNone(response.json["next_cursor"])
+        self.assertEqual(sorted(first_page + second_page), ["Uber eats uber", "Uber tip", "Uber to airport", "Ubering home"])
+
+        response = self.client.get(f"{url}&cursor={next_cursor}&stream=1", headers=self.headers)
+        self.assertEqual([json.loads(line)["Description"] for line in response.get_data(as_text=True).splitlines()], second_page)
+
+        response = self.client.get(f"/api/expense/{self.user_id}/expenses?q=dentist", headers=self.headers)
+        self.assertEqual(response.json["expenses"], [])
+
+        response = self.client.get(f'/api/expense/{self.user_id}/expenses?q=" OR train', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
     def test_create_expense(self):
         with self.app.app_context():
             category = Category(
@@ -99,6 +435,326 @@ class ExpenseTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 201, response.json["message"])
         self.assertIn("Expense created", response.json["message"])
 
+    def test_create_expenses_batch(self):
+        with self.app.app_context():
+            category = Category(category="Restaurants", user_id=self.user_id)
+            db.session.add(category)
+            db.session.commit()
+            category_id = category.id
+
+        payload = {"expenses": [
+            {"date": "2025-05-14", "categoryId": category_id, "amount": 20.5, "description": "Lunch"},
+            {"date": "2025-05-15", "categoryId": category_id, "amount": "12.25", "description": "Dinner"},
+            {"date": "bad-date", "categoryId": category_id, "amount": 3, "description": "Coffee"},
+            {"date": "2025-05-16", "categoryId": str(uuid.uuid4()), "amount": 3, "description": "Coffee"},
+        ]}
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:batch",
+            data=json.dumps(payload),
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([r["status"] for r in response.json["results"]], [201, 201, 400, 404])
+        self.assertIn("Invalid date format", response.json["results"][2]["error"])
+
+        with self.app.app_context():
+            expenses = Expense.query.filter_by(user_id=self.user_id).order_by(Expense.date).all()
+            self.assertEqual([e.description for e in expenses], ["Lunch", "Dinner"])
+            self.assertEqual(expenses[0].id, response.json["results"][0]["id"])
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+
+    def test_create_expenses_batch_amounts(self):
+        with self.app.app_context():
+            category = Category(category="Restaurants", user_id=self.user_id)
+            db.session.add(category)
+            db.session.commit()
+            category_id = category.id
+
+        amounts = ["10.005", "10.005", "10.005", "100000000", "-99999999.995", "99999999.99"]
+        payload = {"expenses": [
+            {"date": "2025-05-14", "categoryId": category_id, "amount": amount, "description": "Lunch"} for amount in amounts
+        ]}
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:batch",
+            data=json.dumps(payload),
+            headers=self.headers
+        )
+        self.assertEqual([r["status"] for r in response.json["results"]], [201, 201, 201, 400, 400, 201])
+        self.assertIn("Invalid value for amount", response.json["results"][3]["error"])
+
+        with self.app.app_context():
+            self.assertEqual(sorted(Decimal(str(e.amount)) for e in Expense.query), [Decimal("10.01")] * 3 + [Decimal("99999999.99")])
+            rollup = ExpenseRollup.query.one()
+            self.assertEqual(Decimal(str(rollup.total)), Decimal("100000030.02"))
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+
+        self.client.post(
+            f"/api/expense/{self.user_id}/expenses:bulkDelete",
+            data=json.dumps({"filter": {"maxAmount": "11"}}),
+            headers=self.headers
+        )
+        with self.app.app_context():
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+
+    def test_create_expenses_batch_too_large(self):
+        payload = {"expenses": [{}] * 5001}
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:batch",
+            data=json.dumps(payload),
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_import_expenses_csv(self):
+        with self.app.app_context():
+            db.session.add(Category(category="Dining", user_id=self.user_id))
+            db.session.commit()
+
+        body = (
+            "Date,Category,Amount,Description\n"
+            "2025-01-05,Dining,12.50,Lunch\n"
+            "2025-01-06,Travel,40,Train\n"
+            "not-a-date,Dining,3,Coffee\n"
+            "2025-01-07,Travel,,Bus\n"
+            "2025-02-01,Gifts,25,Flowers\n"
+        )
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:import",
+            data=body,
+            headers={**self.headers, "Content-Type": "text/csv"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["processed"], 5)
+        self.assertEqual(response.json["imported"], 3)
+        self.assertEqual(response.json["rejected"], 2)
+        self.assertEqual([e["line"] for e in response.json["errors"]], [4, 5])
+
+        with self.app.app_context():
+            names = sorted(c.category for c in Category.query.filter_by(user_id=self.user_id))
+            self.assertEqual(names, ["Dining", "Gifts", "Travel"])
+            self.assertEqual(Expense.query.filter_by(user_id=self.user_id).count(), 3)
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+
+    def test_import_expenses_csv_chunks(self):
+        rows = "".join(f"2025-01-{day:02d},Dining,{day},Meal {day}\n" for day in range(1, 8))
+        stream = io.BytesIO(("date,category,amount,description\n" + rows).encode())
+
+        with self.app.app_context():
+            updates = list(import_expenses_csv(self.user_id, stream, chunk_size=3))
+            self.assertEqual([u["imported"] for u in updates], [3, 6, 7])
+            self.assertTrue(updates[-1]["done"])
+            self.assertEqual(Category.query.filter_by(user_id=self.user_id).count(), 1)
+
+    def test_import_expenses_csv_server_input_stream(self):
+        class Body:
+            # Like gunicorn's request body: read() only, none of the io interface.
+            def __init__(self, data):
+                self.data = io.BytesIO(data)
+
+            def read(self, size=-1):
+                return self.data.read(size)
+
+        body = b"date,category,amount,description\n2025-01-05,Dining,12.50,Lunch\n"
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:import",
+            headers={**self.headers, "Content-Type": "text/csv"},
+            environ_overrides={"wsgi.input": Body(body), "wsgi.input_terminated": True},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["imported"], 1)
+
+    def test_import_expenses_csv_missing_columns(self):
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:import",
+            data="date,amount\n2025-01-01,3\n",
+            headers={**self.headers, "Content-Type": "text/csv"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["imported"], 0)
+        self.assertIn("CSV header", response.json["errors"][0]["error"])
+
+    def add_export_expenses(self):
+        with self.app.app_context():
+            dining = Category(category="Dining", user_id=self.user_id)
+            travel = Category(category="Travel", user_id=self.user_id)
+            db.session.add_all([dining, travel])
+            db.session.commit()
+            db.session.add(Expense(user_id=self.user_id, date=date(2025, 1, 5), category_id=dining.id, amount=12.5, description="Lunch, with tip"))
+            db.session.add(Expense(user_id=self.user_id, date=date(2025, 2, 6), category_id=travel.id, amount=40, description="Train"))
+            db.session.commit()
+            return travel.id
+
+    def test_export_expenses_csv(self):
+        travel_id = self.add_export_expenses()
+
+        response = self.client.get(f"/api/expense/{self.user_id}/export?format=csv", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/csv")
+        rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual(rows[0], ["id", "date", "category", "amount", "description"])
+        self.assertEqual([r[1:] for r in rows[1:]], [
+            ["2025-01-05", "Dining", "12.50", "Lunch, with tip"],
+            ["2025-02-06", "Travel", "40.00", "Train"],
+        ])
+
+        response = self.client.get(f"/api/expense/{self.user_id}/export?categoryId={travel_id}", headers=self.headers)
+        self.assertEqual(len(response.get_data(as_text=True).splitlines()), 2)
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_export_expenses_parquet(self):
+        import pyarrow.parquet as pq
+        self.add_export_expenses()
+
+        response = self.client.get(f"/api/expense/{self.user_id}/export?format=parquet&from=2025-02-01", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        table = pq.read_table(io.BytesIO(response.get_data()))
+        self.assertEqual(table.column("category").to_pylist(), ["Travel"])
+        self.assertEqual(str(table.column("amount")[0]), "40.00")
+
+    def test_export_expenses_invalid_format(self):
+        response = self.client.get(f"/api/expense/{self.user_id}/export?format=xlsx", headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def add_bulk_expenses(self):
+        with self.app.app_context():
+            other_user = User(username="other_user", password="test_password")
+            dining = Category(category="Dining", user_id=self.user_id)
+            travel = Category(category="Travel", user_id=self.user_id)
+            db.session.add_all([other_user, dining, travel])
+            db.session.commit()
+            other_category = Category(category="Dining", user_id=other_user.id)
+            db.session.add(other_category)
+            db.session.commit()
+
+            expenses = [
+                Expense(user_id=self.user_id, date=date(2025, 1, 5), category_id=dining.id, amount=10, description="Lunch"),
+                Expense(user_id=self.user_id, date=date(2025, 1, 20), category_id=dining.id, amount=15, description="Dinner"),
+                Expense(user_id=self.user_id, date=date(2025, 2, 2), category_id=dining.id, amount=20, description="Brunch"),
+                Expense(user_id=other_user.id, date=date(2025, 1, 5), category_id=other_category.id, amount=99, description="Other"),
+            ]
+            db.session.add_all(expenses)
+            db.session.commit()
+            ExpenseRollup.rebuild()
+            db.session.commit()
+            return [e.id for e in expenses], dining.id, travel.id
+
+    def test_bulk_update_expenses(self):
+        expense_ids, dining_id, travel_id = self.add_bulk_expenses()
+
+        payload = {"ids": expense_ids[:2] + [expense_ids[3]], "set": {"categoryId": travel_id, "date": "2025-03-01"}}
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:bulkUpdate",
+            data=json.dumps(payload),
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["count"], 2)
+
+        with self.app.app_context():
+            moved = Expense.query.filter_by(category_id=travel_id).all()
+            self.assertEqual(sorted(e.description for e in moved), ["Dinner", "Lunch"])
+            self.assertTrue(all(e.date == date(2025, 3, 1) for e in moved))
+            self.assertEqual(db.session.get(Expense, expense_ids[3]).description, "Other")
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+
+        payload = {"filter": {"categoryId": travel_id}, "set": {"amount": 5}}
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:bulkUpdate",
+            data=json.dumps(payload),
+            headers=self.headers
+        )
+        self.assertEqual(response.json["count"], 2)
+        with self.app.app_context():
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+
+    def test_bulk_update_expenses_invalid_amount(self):
+        expense_ids, _, _ = self.add_bulk_expenses()
+        with self.app.app_context():
+            rollup = sorted((r.month, r.category_id, Decimal(str(r.total)), r.count) for r in ExpenseRollup.query)
+
+        for amount in ("1e30", "1e12", "nan", "abc"):
+            payload = {"ids": expense_ids[:2], "set": {"amount": amount}}
+            response = self.client.post(
+                f"/api/expense/{self.user_id}/expenses:bulkUpdate",
+                data=json.dumps(payload),
+                headers=self.headers
+            )
+            self.assertEqual(response.status_code, 400, amount)
+            self.assertIn("Invalid value for amount", response.json["error"])
+
+        with self.app.app_context():
+            self.assertEqual(sorted((r.month, r.category_id, Decimal(str(r.total)), r.count) for r in ExpenseRollup.query), rollup)
+
+        payload = {"ids": expense_ids[:1], "set": {"amount": "10.125"}}
+        response = self.client.post(f"/api/expense/{self.user_id}/expenses:bulkUpdate", data=json.dumps(payload), headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        with self.app.app_context():
+            # Rounded like the batch and single create paths.
+            self.assertEqual(Decimal(str(db.session.get(Expense, expense_ids[0]).amount)), Decimal("10.13"))
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+
+    def test_bulk_update_expenses_foreign_category(self):
+        expense_ids, _, _ = self.add_bulk_expenses()
+        with self.app.app_context():
+            other_category_id = db.session.get(Expense, expense_ids[3]).category_id
+
+        payload = {"ids": expense_ids[:1], "set": {"categoryId": other_category_id}}
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:bulkUpdate",
+            data=json.dumps(payload),
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_delete_expenses(self):
+        expense_ids, dining_id, _ = self.add_bulk_expenses()
+
+        payload = {"filter": {"from": "2025-01-01", "to": "2025-01-31", "categoryId": dining_id}}
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:bulkDelete",
+            data=json.dumps(payload),
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["count"], 2)
+
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses:bulkDelete",
+            data=json.dumps({"ids": [expense_ids[3]]}),
+            headers=self.headers
+        )
+        self.assertEqual(response.json["count"], 0)
+
+        with self.app.app_context():
+            self.assertEqual(Expense.query.count(), 2)
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+
+    def test_bulk_delete_requires_selection(self):
+        expense_ids, dining_id, _ = self.add_bulk_expenses()
+
+        for selection in ({"filter": {}}, {"filter": {"from": ""}}, {"filter": {"minAmount": None, "to": ""}}):
+            response = self.client.post(
+                f"/api/expense/{self.user_id}/expenses:bulkDelete",
+                data=json.dumps(selection),
+                headers=self.headers
+            )
+            self.assertEqual(response.status_code, 400, selection)
+            self.assertEqual(response.json["error"], "You must include ids or a filter")
+
+        # A misspelt key must not leave a filter that matches everything.
+        for url, payload in (
+            ("expenses:bulkDelete", {"filter": {"category_id": dining_id}}),
+            ("expenses:bulkDelete", {"ids": expense_ids[:1], "filter": {"category_id": dining_id}}),
+            ("expenses:bulkUpdate", {"filter": {"category_id": dining_id}, "set": {"amount": 1}}),
+        ):
+            response = self.client.post(f"/api/expense/{self.user_id}/{url}", data=json.dumps(payload), headers=self.headers)
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertIn("Unknown filter keys: category_id", response.json["error"])
+
+        with self.app.app_context():
+            self.assertEqual(Expense.query.count(), 4)
+            self.assertEqual(Expense.query.filter_by(amount=1).count(), 0)
+
     def test_create_expense_invalid_date(self):
         payload = {
             "date": "invalid-date",
@@ -114,6 +770,31 @@ class ExpenseTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn("Invalid date format", response.json["error"])
 
+    def test_create_expense_invalid_amount(self):
+        with self.app.app_context():
+            category = Category(category="Restaurants", user_id=self.user_id)
+            db.session.add(category)
+            db.session.commit()
+            category_id = category.id
+
+        for amount in ("abc", "nan", "Infinity", "1e12", "100000000"):
+            payload = {"date": "2025-05-14", "categoryId": category_id, "amount": amount, "description": "Lunch"}
+            response = self.client.post(
+                f"/api/expense/{self.user_id}/expenses",
+                data=json.dumps(payload),
+                headers=self.headers
+            )
+            self.assertEqual(response.status_code, 400, amount)
+            self.assertIn("Invalid value for amount", response.json["error"])
+
+        payload = {"date": "2025-05-14", "categoryId": category_id, "amount": "10.005", "description": "Lunch"}
+        response = self.client.post(f"/api/expense/{self.user_id}/expenses", data=json.dumps(payload), headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        with self.app.app_context():
+            self.assertEqual(Decimal(str(Expense.query.one().amount)), Decimal("10.01"))
+            self.assertEqual(Decimal(str(ExpenseRollup.query.one().total)), Decimal("10.01"))
+            self.assertEqual(ExpenseRollup.mismatches(), [])
+
     def test_create_expense_missing_date(self):
         payload = {
             "Amount": 20.5,
@@ -458,5 +1139,77 @@ class ExpenseTestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(f"Expense {expense_id} deleted", response.json["message"])
 
+class ReplicaTestCase(unittest.TestCase):
+    """Two in-memory SQLite databases stand in for the primary and a replica that never catches up."""
+
+    def setUp(self):
+        load_dotenv('.flaskenv')
+        with mock.patch.object(TestingConfig, "REPLICA_DATABASE_URL", "sqlite:///:memory:"):
+            self.app = create_app('testing')
+        self.app.config["TESTING"] = True
+        self.app.config['JWT_SECRET_KEY'] = uuid.uuid4().hex
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            db.metadata.create_all(db.engines["replica"])
+            self.user_id = str(uuid.uuid4())
+            for engine in (db.engine, db.engines["replica"]):
+                with engine.begin() as connection:
+                    connection.execute(User.__table__.insert(), {
+                        "id": self.user_id,
+                        "username": "test_user",
+                        "password": "test_password",
+                        "created_at": datetime.now(tz=UTC),
+                        "updated_at": datetime.now(tz=UTC),
+                    })
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=self.user_id)}"}
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+            db.metadata.drop_all(db.engines["replica"])
+        # init_app registered an (empty) metadata for the bind on the shared extension; other tests' apps lack it.
+        db.metadatas.pop("replica", None)
+
+    def test_reads_use_replica_outside_write_window(self):
+        url = f"/api/category/{self.user_id}/categories"
+        response = self.client.post(url, json={"Category": "Dining"}, headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+
+        # Within the read-your-writes window the user reads the primary.
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual([c["Category"] for c in response.json["categories"]], ["Dining"])
+        primary_etag = response.headers["ETag"]
+
+        self.app.config["READ_YOUR_WRITES_SECONDS"] = 0
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.json["categories"], [])
+        # The ETag comes from the replica's data version, matching the data it served.
+        self.assertNotEqual(response.headers["ETag"], primary_etag)
+
+        response = self.client.get(f"/api/expense/{self.user_id}/expenses", headers=self.headers)
+        self.assertEqual(response.json["expenses"], [])
+
+    def test_writes_use_primary(self):
+        self.app.config["READ_YOUR_WRITES_SECONDS"] = 0
+        url = f"/api/category/{self.user_id}/categories"
+        self.client.post(url, json={"Category": "Dining"}, headers=self.headers)
+        with self.app.app_context():
+            category_id = db.session.query(Category.id).scalar()
+        response = self.client.post(
+            f"/api/expense/{self.user_id}/expenses",
+            json={"date": "2025-01-01", "categoryId": category_id, "amount": "10.00", "description": "Lunch"},
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 201)
+
+        with self.app.app_context():
+            with db.engine.connect() as connection:
+                self.assertEqual(len(connection.execute(Expense.__table__.select()).all()), 1)
+            with db.engines["replica"].connect() as connection:
+                self.assertEqual(len(connection.execute(Expense.__table__.select()).all()), 0)
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+class GunicornTestCase(unittest.TestCase):
+    def test_gunicorn_profile_pool_sizing(self):
+        # The profile changes the environment and the gc, so it is loaded in a separate process.
+        script = "\n".join([
+            "import json, os, runpy, sys",
+            "settings = runpy.run_path('gunicorn.conf.py')",
+            "sys.stdout.write(json.dumps({",
+            "    'threads': settings['threads'],",
+            "    'pool_size': os.environ['DB_POOL_SIZE'],",
+            "    'max_overflow': os.environ['DB_MAX_OVERFLOW'],",
+            "    'hash_workers': os.environ['PASSWORD_HASH_WORKERS'],",
+            "}))",
+        ])
+        env = {key: value for key, value in os.environ.items() if not key.startswith(("DB_", "PASSWORD_HASH_"))}
+
+        def load(**settings):
+            with tempfile.TemporaryDirectory() as directory:
+                return subprocess.run(
+                    [sys.executable, "-c", script],
+                    env={**env, "PROMETHEUS_MULTIPROC_DIR": directory, **settings},
+                    capture_output=True,
+                    text=True,
+                )
+
+        output = load(GUNICORN_WORKER_CLASS="gthread", GUNICORN_THREADS="8").stdout
+        self.assertEqual(json.loads(output), {"threads": 8, "pool_size": "9", "max_overflow": "8", "hash_workers": "2"})
+        output = load(GUNICORN_WORKER_CLASS="sync", DB_POOL_SIZE="4").stdout
+        self.assertEqual(json.loads(output), {"threads": 1, "pool_size": "4", "max_overflow": "0", "hash_workers": "1"})
+        result = load(GUNICORN_WORKER_CLASS="eventlet")
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("GUNICORN_WORKER_CLASS", result.stderr)
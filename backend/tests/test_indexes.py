@@ -0,0 +1,86 @@
+import unittest
+from config import basedir, create_app, db
+from models import Category, Expense
+from datetime import date
+from dotenv import load_dotenv
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import select, text, tuple_
+import importlib.util
+import io
+import os
+import seeding
+
+MIGRATION = os.path.join(basedir, "database", "versions", "8de94e56e3d9_add_expense_list_and_category_indexes.py")
+
+class IndexTestCase(unittest.TestCase):
+    def setUp(self):
+        load_dotenv('.flaskenv')
+        self.app = create_app('testing')
+        self.app.config["TESTING"] = True
+
+        with self.app.app_context():
+            db.create_all()
+            seeding.seed(db.session, users=10, categories=8, expenses=5000, password="unused")
+            db.session.execute(text("ANALYZE"))
+            self.user_id, self.category_id = db.session.execute(select(Category.user_id, Category.id).limit(1)).one()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def plan(self, statement):
+        sql = statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+        return [row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    def test_list_queries_use_user_date_index(self):
+        ordered = (Expense.date, Expense.id)
+        statements = [
+            Expense.list_select(Expense.user_id == self.user_id).order_by(*ordered),
+            Expense.list_select(Expense.user_id == self.user_id, tuple_(*ordered) > (date(2025, 1, 1), "")).order_by(*ordered).limit(51),
+            Expense.list_select(Expense.user_id == self.user_id, Expense.date >= date(2025, 1, 1), Expense.date <= date(2025, 3, 31)).order_by(*ordered),
+        ]
+        with self.app.app_context():
+            for statement in statements:
+                plan = self.plan(statement)
+                self.assertTrue(plan[0].startswith("SEARCH expense USING INDEX ix_expense_user_id_date_id (user_id=?"), plan)
+                # Rows come out of the index already in list order.
+                self.assertFalse(any("TEMP B-TREE" in step for step in plan), plan)
+
+    def test_category_queries_use_indexes(self):
+        with self.app.app_context():
+            plan = self.plan(Expense.list_select(Expense.user_id == self.user_id, Expense.category_id == self.category_id))
+            self.assertTrue(any("USING INDEX ix_expense_" in step and step.startswith("SEARCH expense") for step in plan), plan)
+
+            plan = self.plan(select(Expense.id).where(Expense.category_id == self.category_id).limit(1))
+            self.assertEqual(plan, ["SEARCH expense USING INDEX ix_expense_category_id (category_id=?)"])
+
+            plan = self.plan(select(Category).where(Category.user_id == self.user_id))
+            self.assertEqual(len(plan), 1)
+            self.assertRegex(plan[0], r"^SEARCH category USING INDEX sqlite_autoindex_category_\d \(user_id=\?\)$")
+
+    def test_postgresql_migration_builds_indexes_concurrently(self):
+        spec = importlib.util.spec_from_file_location("index_migration", MIGRATION)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+
+        output = io.StringIO()
+        context = MigrationContext.configure(
+            dialect_name="postgresql", opts={"as_sql": True, "output_buffer": output, "transactional_ddl": True}
+        )
+        with Operations.context(context), context.begin_transaction():
+            migration.upgrade()
+        statements = [statement.strip() for statement in output.getvalue().split(";") if statement.strip()]
+
+        self.assertEqual(statements[:3], [
+            "BEGIN",
+            "ALTER TABLE expense ALTER COLUMN category_id TYPE VARCHAR(36)",
+            "COMMIT",
+        ])
+        self.assertIn("CREATE INDEX CONCURRENTLY ix_expense_user_id_date_id ON expense (user_id, date, id)", statements)
+        self.assertIn("CREATE INDEX CONCURRENTLY ix_expense_category_id ON expense (category_id)", statements)
+        # No concurrent build runs inside a transaction block.
+        concurrent = [i for i, statement in enumerate(statements) if "CONCURRENTLY" in statement]
+        self.assertEqual(concurrent, list(range(3, 3 + len(concurrent))))
+        self.assertEqual(statements[3 + len(concurrent)], "BEGIN")
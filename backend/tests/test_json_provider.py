@@ -0,0 +1,86 @@
+import unittest
+from config import create_app, db
+from models import Category, Expense, User
+from datetime import date, datetime, UTC
+from decimal import Decimal
+from dotenv import load_dotenv
+from flask_jwt_extended import create_access_token
+from unittest import mock
+import importlib.util
+import json_provider
+import uuid
+
+PAYLOAD = {
+    "name": "Café",
+    "date": date(2025, 3, 24),
+    "created": datetime(2025, 3, 24, 12, 30, 5, 250000),
+    "aware": datetime(2025, 3, 24, 12, 30, tzinfo=UTC),
+    "amount": Decimal("1234567.89"),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "nested": [{"b": 1, "a": 2.5, "c": None}],
+}
+EXPECTED = (
+    '{"amount":"1234567.89","aware":"2025-03-24T12:30:00+00:00","created":"2025-03-24T12:30:05.250000",'
+    '"date":"2025-03-24","id":"12345678-1234-5678-1234-567812345678","name":"Café",'
+    '"nested":[{"a":2.5,"b":1,"c":null}]}'
+)
+
+class JSONProviderTestCase(unittest.TestCase):
+    def setUp(self):
+        load_dotenv('.flaskenv')
+        self.app = create_app('testing')
+        self.app.config["TESTING"] = True
+        self.app.config['JWT_SECRET_KEY'] = uuid.uuid4().hex
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_encodes_natively(self):
+        self.assertEqual(self.app.json.dumps(PAYLOAD), EXPECTED)
+        with self.app.test_request_context():
+            response = self.app.json.response(PAYLOAD)
+        self.assertEqual(response.get_data(as_text=True), EXPECTED + "\n")
+        self.assertEqual(self.app.json.loads(EXPECTED)["amount"], "1234567.89")
+
+    def test_fallback_matches(self):
+        with mock.patch.object(json_provider, "orjson", None):
+            self.assertEqual(self.app.json.dumps(PAYLOAD), EXPECTED)
+            self.assertEqual(self.app.json.loads(EXPECTED.encode()), self.app.json.loads(EXPECTED))
+
+        # Beyond orjson's 64-bit integers.
+        self.assertEqual(self.app.json.dumps({"n": 2 ** 70}), '{"n":1180591620717411303424}')
+
+    @unittest.skipUnless(importlib.util.find_spec("orjson"), "orjson is not installed")
+    def test_debug_output_is_indented(self):
+        self.app.debug = True
+        indented = self.app.json.dumps({"b": [1], "a": None})
+        with mock.patch.object(json_provider, "orjson", None):
+            self.assertEqual(self.app.json.dumps({"b": [1], "a": None}), indented)
+        self.assertEqual(indented, '{\n  "a": null,\n  "b": [\n    1\n  ]\n}')
+
+    def test_expense_list_dates(self):
+        with self.app.app_context():
+            user = User(username="test_user", password="test_password")
+            db.session.add(user)
+            db.session.commit()
+            category = Category(category="Dining", user_id=user.id)
+            db.session.add(category)
+            db.session.commit()
+            db.session.add(Expense(user_id=user.id, date=date(2025, 3, 24), category_id=category.id, amount=Decimal("60.54"), description="Dinner"))
+            db.session.commit()
+            user_id, headers = user.id, {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+        expense = self.client.get(f"/api/expense/{user_id}/expenses", headers=headers).json["expenses"][0]
+        self.assertEqual((expense["Date"], expense["Amount"]), ("2025-03-24", 60.54))
+
+        response = self.client.post(
+            f"/api/expense/{user_id}/expenses:batch",
+            data='{"expenses": [',
+            headers={**headers, "Content-Type": "application/json"},
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,184 @@
+import unittest
+from config import TestingConfig, create_app, db, engine_options
+from models import User
+from dotenv import load_dotenv
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine, exc
+from pool_metrics import InstrumentedQueuePool, PoolMetrics
+from unittest import mock
+from prometheus_client import REGISTRY
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+
+class MetricsTestCase(unittest.TestCase):
+    def setUp(self):
+        load_dotenv('.flaskenv')
+        self.app = create_app('testing')
+        self.app.config["TESTING"] = True
+        self.app.config['JWT_SECRET_KEY'] = uuid.uuid4().hex
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(username="test_user", password="test_password")
+            db.session.add(user)
+            db.session.commit()
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_get_pool_metrics(self):
+        response = self.client.get("/api/metrics/pool", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        stats = response.json["default"]
+        self.assertEqual(stats["pool"], "StaticPool")
+        # The request's own session holds the connection while the response is built.
+        self.assertGreaterEqual(stats["in_use_max"], 1)
+
+        response = self.client.get("/api/metrics/pool")
+        self.assertEqual(response.status_code, 401)
+
+    def test_engine_options_from_environment(self):
+        with mock.patch.dict(os.environ, {"DB_POOL_SIZE": "3", "DB_POOL_PRE_PING": "false"}):
+            options = engine_options(pool_size=10, max_overflow=5, pool_timeout=30, pool_recycle=1800)
+        self.assertEqual(options["pool_size"], 3)
+        self.assertEqual(options["max_overflow"], 5)
+        self.assertFalse(options["pool_pre_ping"])
+        self.assertIs(options["poolclass"], InstrumentedQueuePool)
+
+    def test_checkout_waits_and_timeouts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(
+                f"sqlite:///{directory}/pool.db",
+                **engine_options(pool_size=1, max_overflow=0, pool_timeout=0.05, pool_recycle=1800),
+            )
+            metrics = PoolMetrics(engine)
+
+            held = engine.connect()
+            with self.assertRaises(exc.TimeoutError):
+                engine.connect()
+            stats = metrics.stats()
+            self.assertEqual(stats["in_use"], 1)
+            self.assertEqual(stats["checkouts"], 2)
+            self.assertEqual(stats["waits"], 1)
+            self.assertEqual(stats["timeouts"], 1)
+            self.assertEqual(stats["checkout_seconds_buckets"]["+Inf"], 2)
+            self.assertGreaterEqual(stats["checkout_seconds_max"], 0.05)
+            held.close()
+
+            # A disposed engine gets a new pool, which keeps reporting to the same metrics.
+            engine.dispose()
+            engine.connect().close()
+            stats = metrics.stats()
+            self.assertEqual(stats["checkouts"], 3)
+            self.assertEqual(stats["in_use"], 0)
+            self.assertEqual(stats["connects"], 2)
+            engine.dispose()
+
+class InstrumentationTestCase(unittest.TestCase):
+    def create_app(self, **settings):
+        with mock.patch.multiple(TestingConfig, **settings):
+            app = create_app('testing')
+        app.config['JWT_SECRET_KEY'] = uuid.uuid4().hex
+        with app.app_context():
+            db.create_all()
+            user = User(username="test_user", password="test_password")
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+        self.addCleanup(self.drop_all, app)
+        return app
+
+    def drop_all(self, app):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_server_timing(self):
+        app = self.create_app(SERVER_TIMING=True)
+        response = app.test_client().get(f"/api/expense/{self.user_id}/expenses", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        db_timing, json_timing, total_timing = response.headers["Server-Timing"].split(", ")
+        # Revocation filter load, data version and the list itself.
+        self.assertRegex(db_timing, r'^db;desc="[1-9]\d* statements";dur=\d+\.\d\d$')
+        self.assertRegex(json_timing, r"^json;dur=\d+\.\d\d$")
+        self.assertRegex(total_timing, r"^total;dur=\d+\.\d\d$")
+
+    def test_slow_query_log(self):
+        app = self.create_app(SLOW_QUERY_MS=1e-6)
+        with self.assertLogs("slow_query", level="WARNING") as logs:
+            response = app.test_client().get(f"/api/category/{self.user_id}/categories", headers=self.headers)
+        self.assertNotIn("Server-Timing", response.headers)
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        entry = next(entry for entry in entries if "FROM category" in entry["statement"])
+        self.assertEqual(entry["endpoint"], "category.get_expenses")
+        self.assertEqual(entry["path"], f"/api/category/{self.user_id}/categories")
+
+    def test_disabled_by_default(self):
+        app = self.create_app(SERVER_TIMING=False, SLOW_QUERY_MS=0, PROMETHEUS_METRICS=False)
+        with mock.patch("instrumentation.time.perf_counter") as perf_counter:
+            response = app.test_client().get(f"/api/expense/{self.user_id}/expenses", headers=self.headers)
+        self.assertNotIn("Server-Timing", response.headers)
+        perf_counter.assert_not_called()
+
+    def test_prometheus_metrics(self):
+        app = self.create_app(PROMETHEUS_METRICS=True)
+        client = app.test_client()
+        labels = {"blueprint": "category", "endpoint": "category.get_expenses", "method": "GET"}
+        before = REGISTRY.get_sample_value("http_requests_total", {**labels, "status": "200"}) or 0
+        statements_before = REGISTRY.get_sample_value("http_request_db_statements_count", labels) or 0
+
+        client.get(f"/api/category/{self.user_id}/categories", headers=self.headers)
+        client.get(f"/api/category/{self.user_id}/categories", headers=self.headers)
+        self.assertEqual(REGISTRY.get_sample_value("http_requests_total", {**labels, "status": "200"}), before + 2)
+        self.assertEqual(REGISTRY.get_sample_value("http_request_db_statements_count", labels), statements_before + 2)
+
+        response = client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain"))
+        body = response.get_data(as_text=True)
+        self.assertIn(
+            'http_request_duration_seconds_bucket{blueprint="category",endpoint="category.get_expenses",le="0.005",method="GET"}',
+            body,
+        )
+        self.assertIn("worker_resident_memory_bytes", body)
+
+    def test_metrics_token(self):
+        app = self.create_app(METRICS_TOKEN="scrape-secret")
+        client = app.test_client()
+        self.assertEqual(client.get("/metrics").status_code, 401)
+        response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        self.assertEqual(response.status_code, 200)
+
+        # The cache counters follow the token too, and an access token alone is not enough.
+        self.assertEqual(client.get("/api/metrics/cache", headers=self.headers).status_code, 401)
+        response = client.get("/api/metrics/cache", headers={"Authorization": "Bearer scrape-secret"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hits", response.json)
+
+    def test_metrics_aggregate_across_processes(self):
+        # Each process stands in for a gunicorn worker writing to the shared directory.
+        script = "\n".join([
+            "import sys",
+            "from config import create_app",
+            "client = create_app('testing').test_client()",
+            "client.get('/api/metrics/cache')",
+            "sys.stdout.write(client.get('/metrics').get_data(as_text=True))",
+        ])
+        with tempfile.TemporaryDirectory() as directory:
+            env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": directory}
+            for _ in range(2):
+                output = subprocess.run(
+                    [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True
+                ).stdout
+        line = 'http_requests_total{blueprint="metrics",endpoint="metrics.get_cache_metrics",method="GET",status="401"}'
+        self.assertIn(f"{line} 2.0", output)
+